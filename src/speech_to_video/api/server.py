@@ -1,8 +1,10 @@
 import json
 import logging
 import os
-import tempfile
+import re
 import time
+
+import aiofiles.tempfile
 from typing import Any, Dict, List, Optional
 
 from logging.handlers import RotatingFileHandler
@@ -20,10 +22,12 @@ logger = logging.getLogger(__name__)
 
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import ORJSONResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 from starlette.responses import StreamingResponse
-import requests
+import httpx
 import shutil
 import glob
 
@@ -41,7 +45,41 @@ from .firebase_auth import verify_firebase_token
 settings = get_settings()
 service = VideoService(settings)
 
-app = FastAPI(title="Speech to Video API")
+# Comma- or newline-separated URL lists from the stitch form; compiled once,
+# splits in a single pass and collapses separator runs.
+_URL_SPLIT_RE = re.compile(r"[,\n]+")
+
+# Read once at import — these are static for the process lifetime, and the
+# clip endpoints are hot enough that per-request os.getenv adds up.
+_CLIPS_NAMESPACE = os.getenv("CLIPS_NAMESPACE", "")
+_CLIPS_BASE_DIR = os.getenv("CLIPS_DIR") or os.path.join(os.path.abspath(os.getcwd()), "clips")
+# Legacy pre-namespace stitch output; cwd never changes after import so the
+# abspath resolution is a one-time cost.
+_LEGACY_STITCHED_PATH = os.path.abspath("stitched_output.mp4")
+
+from contextlib import asynccontextmanager
+
+
+@asynccontextmanager
+async def _lifespan(app_: FastAPI):
+    # Shared upstream HTTP client for /api/proxy-video. Keep-alive reuse avoids
+    # re-paying TCP+TLS handshakes on every proxied clip, and async streaming
+    # keeps the event loop free while bytes are in flight.
+    app_.state.http = httpx.AsyncClient(
+        timeout=600,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        follow_redirects=True,
+    )
+    _log_job_manager_startup()
+    _maybe_run_startup_diagnostic()
+    _mount_gradio(app_)
+    _mount_static(app_)
+    yield
+    _log_job_orphan_snapshot()
+    await app_.state.http.aclose()
+
+
+app = FastAPI(title="Speech to Video API", default_response_class=ORJSONResponse, lifespan=_lifespan)
 app.include_router(credits_api.router)
 app.include_router(legal_api.router)
 
@@ -61,6 +99,28 @@ app.add_middleware(
 )
 
 
+async def _spool_upload_to_tmp(upload: UploadFile) -> str:
+    """Stream an uploaded file to a named temp file in 1 MiB chunks.
+
+    Keeps peak memory O(chunk) instead of materializing the whole upload as a
+    bytes object before writing. Returns the temp file path; caller removes it.
+    """
+    suffix = os.path.splitext(upload.filename or "")[1] or ".wav"
+    try:
+        async with aiofiles.tempfile.NamedTemporaryFile("wb", delete=False, suffix=suffix) as tmpf:
+            while True:
+                chunk = await upload.read(1 << 20)
+                if not chunk:
+                    break
+                await tmpf.write(chunk)
+            return str(tmpf.name)
+    finally:
+        try:
+            await upload.close()
+        except Exception:
+            pass
+
+
 @app.get("/api/health")
 def health():
     return {"status": "ok"}
@@ -153,9 +213,13 @@ def _check_credits_or_402(user: Dict, cost: int) -> int:
     return balance
 
 
-def _user_namespace(user: Dict) -> Optional[str]:
-    """Build clip-store namespace: env-prefix / firebase-uid."""
-    ns = os.getenv("CLIPS_NAMESPACE", "")
+def _user_namespace(user: Dict = Depends(verify_firebase_token)) -> Optional[str]:
+    """Build clip-store namespace: env-prefix / firebase-uid.
+
+    Doubles as a FastAPI dependency — handlers that only need the namespace
+    declare `namespace: Optional[str] = Depends(_user_namespace)` and FastAPI
+    caches the token verification per request."""
+    ns = _CLIPS_NAMESPACE
     uid = user["uid"]
     return "/".join([p for p in [ns, uid] if p]) or None
 
@@ -213,7 +277,7 @@ def delete_account(user: Dict = Depends(verify_firebase_token)):
         raise HTTPException(status_code=500, detail=f"firebase_delete_failed: {exc}")
 
     logger.info("account deleted uid=%s result=%s", uid, deleted)
-    return JSONResponse({"success": True, "deleted": deleted})
+    return ORJSONResponse({"success": True, "deleted": deleted})
 
 
 @app.post("/api/generate")
@@ -226,7 +290,7 @@ def generate_video(
     if not prompt or len(prompt.strip()) == 0:
         raise HTTPException(status_code=400, detail="Prompt is required")
     result = service.generate_video(prompt=prompt.strip(), duration=int(duration), quality=quality)
-    return JSONResponse(result)
+    return ORJSONResponse(result)
 
 
 @app.post("/api/speech-to-video")
@@ -237,34 +301,29 @@ async def speech_to_video(
     prompt: Optional[str] = Form(None),
     user: Dict = Depends(verify_firebase_token),
 ):
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(audio.filename or "")[1] or ".wav") as tmpf:
-            contents = await audio.read()
-            tmpf.write(contents)
-            tmp_path = tmpf.name
-    finally:
-        try:
-            await audio.close()
-        except Exception:
-            pass
+    tmp_path = await _spool_upload_to_tmp(audio)
 
     try:
+        # Service calls block for the full model round trip — keep them off the
+        # event loop so concurrent requests stay responsive.
         if prompt and prompt.strip():
-            result = service.generate_video(prompt=prompt.strip(), duration=int(duration), quality=quality)
+            result = await run_in_threadpool(
+                service.generate_video, prompt=prompt.strip(), duration=int(duration), quality=quality
+            )
         else:
-            result = service.speech_to_video_with_audio(audio_path=tmp_path, duration=int(duration), quality=quality)
-        return JSONResponse(result)
+            result = await run_in_threadpool(
+                service.speech_to_video_with_audio, audio_path=tmp_path, duration=int(duration), quality=quality
+            )
+        return ORJSONResponse(result)
     finally:
-        try:
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
-        except Exception:
-            pass
+        # Single unlink syscall; missing_ok covers the already-gone case
+        # without the racy stat-then-remove pair.
+        pathlib.Path(tmp_path).unlink(missing_ok=True)
 
 
 @app.get("/api/clips")
-def get_clips(user: Dict = Depends(verify_firebase_token)):
-    return JSONResponse(list_clips(_user_namespace(user)))
+def get_clips(namespace: Optional[str] = Depends(_user_namespace)):
+    return ORJSONResponse(list_clips(namespace))
 
 
 @app.post("/api/clips")
@@ -272,42 +331,41 @@ def save_clip(
     url: str = Form(...),
     note: Optional[str] = Form(None),
     json_response: Optional[str] = Form(None),
-    user: Dict = Depends(verify_firebase_token),
+    namespace: Optional[str] = Depends(_user_namespace),
 ):
     if not url:
         raise HTTPException(status_code=400, detail="url is required")
-    entry = add_clip(url, note, _user_namespace(user), json_response=json_response)
-    return JSONResponse({"success": True, "saved": entry})
+    entry = add_clip(url, note, namespace, json_response=json_response)
+    return ORJSONResponse({"success": True, "saved": entry})
 
 
 @app.get("/api/clips/{ts}/response")
-def get_clip_response(ts: int, user: Dict = Depends(verify_firebase_token)):
-    content = get_response(ts, _user_namespace(user))
+def get_clip_response(ts: int, namespace: Optional[str] = Depends(_user_namespace)):
+    content = get_response(ts, namespace)
     if content is None:
         raise HTTPException(status_code=404, detail="No saved response for this clip")
-    return JSONResponse(json.loads(content))
+    return ORJSONResponse(json.loads(content))
 
 
 @app.delete("/api/clips")
-def delete_clips(user: Dict = Depends(verify_firebase_token)):
-    clear_clips(_user_namespace(user))
-    return JSONResponse({"success": True, "cleared": True})
+def delete_clips(namespace: Optional[str] = Depends(_user_namespace)):
+    clear_clips(namespace)
+    return ORJSONResponse({"success": True, "cleared": True})
 
 
 @app.delete("/api/clips/{ts}")
-def delete_clip(ts: int, user: Dict = Depends(verify_firebase_token)):
+def delete_clip(ts: int, namespace: Optional[str] = Depends(_user_namespace)):
     try:
-        ok = remove_clip(ts, _user_namespace(user))
+        ok = remove_clip(ts, namespace)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"failed to delete: {exc}")
     if not ok:
         raise HTTPException(status_code=404, detail="not found")
-    return JSONResponse({"success": True})
+    return ORJSONResponse({"success": True})
 
 
 @app.post("/api/clips/reorder")
-def clips_reorder(order: str = Form(...), user: Dict = Depends(verify_firebase_token)):
-    namespace = _user_namespace(user)
+def clips_reorder(order: str = Form(...), namespace: Optional[str] = Depends(_user_namespace)):
     order_ts: list[int] = []
     s = (order or "").strip()
     if s.startswith("["):
@@ -326,17 +384,16 @@ def clips_reorder(order: str = Form(...), user: Dict = Depends(verify_firebase_t
     if not order_ts:
         raise HTTPException(status_code=400, detail="invalid order")
     new_items = reorder_clips(order_ts, namespace)
-    return JSONResponse({"success": True, "clips": new_items})
+    return ORJSONResponse({"success": True, "clips": new_items})
 
 
 @app.post("/api/stitch")
 def stitch(
     urls: Optional[str] = Form(None),
     use_saved: bool = Form(False),
-    user: Dict = Depends(verify_firebase_token),
+    namespace: Optional[str] = Depends(_user_namespace),
 ):
     url_list: List[str] = []
-    namespace = _user_namespace(user)
     if use_saved:
         items = list_clips(namespace)
         filtered: List[str] = []
@@ -352,18 +409,18 @@ def stitch(
             if not (u.startswith("http://") or u.startswith("https://")):
                 continue
             filtered.append(u)
-        seen = set()
-        url_list = [x for x in filtered if not (x in seen or seen.add(x))]
+        # De-dupe while preserving playlist order
+        url_list = list(dict.fromkeys(filtered))
     else:
         if urls:
-            parts = [p.strip() for p in urls.replace("\n", ",").split(",")]
+            parts = [p.strip() for p in _URL_SPLIT_RE.split(urls)]
             url_list = [p for p in parts if p and (p.startswith("http://") or p.startswith("https://"))]
     if not url_list:
         raise HTTPException(status_code=400, detail="No URLs to stitch")
     detailed = stitch_videos_detailed(url_list)
     if detailed.get("success") and detailed.get("output_path"):
         out_path = detailed.get("output_path")
-        base_dir = os.getenv("CLIPS_DIR") or os.path.join(os.path.abspath(os.getcwd()), "clips")
+        base_dir = _CLIPS_BASE_DIR
         target_dir = os.path.join(base_dir, *(namespace.split("/") if namespace else []), "stitched")
         os.makedirs(target_dir, exist_ok=True)
         fname = f"stitched-{int(time.time())}.mp4"
@@ -377,31 +434,43 @@ def stitch(
                 pass
         except Exception as exc:
             detailed.setdefault("error", str(exc))
-    return JSONResponse(detailed)
+    return ORJSONResponse(detailed)
+
+
+def _stitched_file_response(path: str, filename: str) -> FileResponse:
+    """Serve a stitched MP4 with byte-range support for <video> seeks.
+
+    Passing stat_result lets Starlette set Content-Length/Accept-Ranges and
+    honor Range headers without re-statting the file per header."""
+    return FileResponse(
+        path,
+        media_type="video/mp4",
+        filename=filename,
+        stat_result=os.stat(path),
+    )
 
 
 @app.get("/api/stitched")
-def get_stitched_file(user: Dict = Depends(verify_firebase_token)):
-    namespace = _user_namespace(user) or ""
-    base_dir = os.getenv("CLIPS_DIR") or os.path.join(os.path.abspath(os.getcwd()), "clips")
+def get_stitched_file(namespace: Optional[str] = Depends(_user_namespace)):
+    namespace = namespace or ""
+    base_dir = _CLIPS_BASE_DIR
     target_dir = os.path.join(base_dir, *(namespace.split("/") if namespace else []), "stitched")
     if os.path.isdir(target_dir):
         files = sorted(glob.glob(os.path.join(target_dir, "stitched-*.mp4")))
         if files:
             latest = files[-1]
-            return FileResponse(latest, media_type="video/mp4", filename=os.path.basename(latest))
-    path = os.path.abspath("stitched_output.mp4")
-    if not os.path.exists(path):
+            return _stitched_file_response(latest, os.path.basename(latest))
+    if not os.path.exists(_LEGACY_STITCHED_PATH):
         raise HTTPException(status_code=404, detail="No stitched file found")
-    return FileResponse(path, media_type="video/mp4", filename="stitched_output.mp4")
+    return _stitched_file_response(_LEGACY_STITCHED_PATH, "stitched_output.mp4")
 
 
 @app.get("/api/stitched/{name}")
-def get_stitched_named(name: str, user: Dict = Depends(verify_firebase_token)):
+def get_stitched_named(name: str, namespace: Optional[str] = Depends(_user_namespace)):
     if not name.endswith(".mp4"):
         raise HTTPException(status_code=400, detail="Invalid filename")
-    base_dir = os.getenv("CLIPS_DIR") or os.path.join(os.path.abspath(os.getcwd()), "clips")
-    namespace = _user_namespace(user) or ""
+    base_dir = _CLIPS_BASE_DIR
+    namespace = namespace or ""
     search_dirs = []
     if namespace:
         search_dirs.append(os.path.join(base_dir, *(namespace.split("/")), "stitched"))
@@ -409,32 +478,56 @@ def get_stitched_named(name: str, user: Dict = Depends(verify_firebase_token)):
     for d in search_dirs:
         path = os.path.join(d, name)
         if os.path.isfile(path):
-            return FileResponse(path, media_type="video/mp4", filename=name)
+            return _stitched_file_response(path, name)
     raise HTTPException(status_code=404, detail="Stitched file not found")
 
 
+# 256 KiB chunks: throughput plateaus around 100-256 KiB for large media, and
+# small chunks just multiply Python-level iterations per MB proxied.
+_PROXY_CHUNK_SIZE = int(os.getenv("PROXY_CHUNK_SIZE", str(256 * 1024)))
+
+
 @app.get("/api/proxy-video")
-def proxy_video(url: str):
+async def proxy_video(request: Request, url: str):
     if not url:
         raise HTTPException(status_code=400, detail="url is required")
+    client: httpx.AsyncClient = request.app.state.http
     try:
-        r = requests.get(url, stream=True, timeout=600)
+        upstream = await client.send(client.build_request("GET", url), stream=True)
     except Exception as exc:
         raise HTTPException(status_code=502, detail=f"Upstream fetch failed: {exc}")
 
-    status = r.status_code
+    status = upstream.status_code
     if status >= 400:
+        await upstream.aclose()
         raise HTTPException(status_code=status, detail=f"Upstream returned {status}")
 
     headers = {}
-    ct = r.headers.get("Content-Type")
+    ct = upstream.headers.get("Content-Type")
     if ct:
         headers["Content-Type"] = ct
-    cl = r.headers.get("Content-Length")
+    cl = upstream.headers.get("Content-Length")
     if cl:
         headers["Content-Length"] = cl
 
-    return StreamingResponse(r.iter_content(chunk_size=8192), headers=headers, status_code=status)
+    async def _relay():
+        # Stop pulling from the CDN as soon as the viewer goes away (closed
+        # tab, scrubbed past, app backgrounded) — otherwise we keep streaming
+        # a multi-hundred-MB clip to nobody until the 600s timeout. Checked
+        # every few chunks; is_disconnected is a cheap receive-queue peek.
+        chunks = 0
+        async for chunk in upstream.aiter_raw(chunk_size=_PROXY_CHUNK_SIZE):
+            yield chunk
+            chunks += 1
+            if chunks % 8 == 0 and await request.is_disconnected():
+                break
+
+    return StreamingResponse(
+        _relay(),
+        headers=headers,
+        status_code=status,
+        background=BackgroundTask(upstream.aclose),
+    )
 
 
 @app.post("/api/transcribe")
@@ -442,40 +535,51 @@ async def transcribe(
     audio: UploadFile = File(...),
     user: Dict = Depends(verify_firebase_token),
 ):
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(audio.filename or "")[1] or ".wav") as tmpf:
-            contents = await audio.read()
-            tmpf.write(contents)
-            tmp_path = tmpf.name
-    finally:
-        try:
-            await audio.close()
-        except Exception:
-            pass
-
+    # No disk round trip: hand the upload's spooled file straight to Whisper.
+    # Small clips never leave memory; larger ones are already on disk courtesy
+    # of SpooledTemporaryFile's rollover.
     try:
         try:
-            result = service.openai_client.transcribe(tmp_path)
+            audio.file.seek(0)
+            result = await run_in_threadpool(
+                service.openai_client.transcribe_stream, audio.file, audio.filename
+            )
         except Exception as exc:
-            return JSONResponse({"success": False, "error": str(exc)})
+            return ORJSONResponse({"success": False, "error": str(exc)})
         text = (result or {}).get("text", "")
-        return JSONResponse({"success": True, "text": text, "length": len(text)})
+        return ORJSONResponse({"success": True, "text": text, "length": len(text)})
     finally:
         try:
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
+            await audio.close()
         except Exception:
             pass
 
 
-# Optionally mount Gradio UI at /gradio for transition
-try:
-    import gradio as gr  # type: ignore
-    from ..webui.app import app as gradio_blocks
+def _mount_gradio(app_: FastAPI) -> None:
+    """Mount the legacy Gradio UI at /gradio (default on; ENABLE_GRADIO=0 to skip).
 
-    app = gr.mount_gradio_app(app, gradio_blocks, path="/gradio")
-except Exception:
-    pass
+    Runs at startup, not import: the gradio import pulls in pandas/numpy/PIL
+    and was paying its cost on every worker boot and --reload cycle even
+    though the transitional UI is rarely used."""
+    if os.getenv("ENABLE_GRADIO", "1").lower() in {"0", "false", "no", "off"}:
+        return
+    try:
+        import gradio as gr  # type: ignore
+        from ..webui.app import app as gradio_blocks
+
+        gr.mount_gradio_app(app_, gradio_blocks, path="/gradio")
+        # This app was built with a custom lifespan, so the on_event("startup")
+        # handler mount_gradio_app registers never runs — and with the Blocks
+        # queue enabled, an unstarted queue hangs every queued event. Invoke
+        # the Blocks' startup events explicitly (method name varies across
+        # gradio 4.x releases).
+        for name in ("run_startup_events", "startup_events"):
+            fn = getattr(gradio_blocks, name, None)
+            if callable(fn):
+                fn()
+                break
+    except Exception:
+        logger.exception("Gradio mount failed; continuing without /gradio")
 
 
 def _mount_static(app_: FastAPI) -> None:
@@ -491,7 +595,7 @@ def _mount_static(app_: FastAPI) -> None:
 
 @app.get("/api/timelapse/options")
 def timelapse_options():
-    return JSONResponse(get_all_options())
+    return ORJSONResponse(get_all_options())
 
 
 @app.post("/api/generate/timelapse")
@@ -562,7 +666,7 @@ async def generate_timelapse(request: Request, user: Dict = Depends(verify_fireb
         num_stages=num_stages,
     )
 
-    return JSONResponse({"job_id": job_id})
+    return ORJSONResponse({"job_id": job_id})
 
 
 @app.post("/api/generate/custom-videos")
@@ -608,11 +712,11 @@ async def generate_custom_videos(request: Request, user: Dict = Depends(verify_f
         on_progress=on_progress,
     )
 
-    return JSONResponse({"job_id": job_id})
+    return ORJSONResponse({"job_id": job_id})
 
 
 @app.post("/api/generate/stitch-custom")
-async def stitch_custom_videos(request: Request, user: Dict = Depends(verify_firebase_token)):
+async def stitch_custom_videos(request: Request, namespace: Optional[str] = Depends(_user_namespace)):
     try:
         body = await request.json()
     except Exception:
@@ -632,8 +736,8 @@ async def stitch_custom_videos(request: Request, user: Dict = Depends(verify_fir
 
     if result.get("success") and result.get("output_path"):
         out_path = result["output_path"]
-        namespace = _user_namespace(user) or ""
-        base_dir = os.getenv("CLIPS_DIR") or os.path.join(os.path.abspath(os.getcwd()), "clips")
+        namespace = namespace or ""
+        base_dir = _CLIPS_BASE_DIR
         target_dir = os.path.join(base_dir, *(namespace.split("/") if namespace else []), "stitched")
         os.makedirs(target_dir, exist_ok=True)
         fname = f"stitched-{int(time.time())}.mp4"
@@ -644,7 +748,7 @@ async def stitch_custom_videos(request: Request, user: Dict = Depends(verify_fir
         except Exception as exc:
             result.setdefault("error", str(exc))
 
-    return JSONResponse(result)
+    return ORJSONResponse(result)
 
 
 def _maybe_consume_job_credits(job: Dict, job_id: str) -> None:
@@ -702,7 +806,7 @@ def get_job_status(job_id: str, user: Dict = Depends(verify_firebase_token)):
 
     for internal_field in ("created_at", "uid", "is_anonymous", "credit_cost", "credit_consumed", "usage_counted"):
         job.pop(internal_field, None)
-    return JSONResponse(job)
+    return ORJSONResponse(job)
 
 
 @app.get("/api/jobs/{job_id}/stream")
@@ -806,7 +910,7 @@ def create_fake_job():
         }
 
     start_job(job_id, fake_worker)
-    return JSONResponse({"job_id": job_id})
+    return ORJSONResponse({"job_id": job_id})
 
 
 # AIV-80: long-thread durability harness.
@@ -903,6 +1007,9 @@ def _run_image_edit_diagnostic() -> Dict[str, Any]:
         "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
         "api_url": api_url,
     }
+    # One session for the whole run — the socket probe below measures the raw
+    # handshake explicitly, so the HTTP probes reuse connections like prod does.
+    session = _req.Session()
     logger.info("[DEBUG time-image-edit] starting run at %s", result["started_at"])
 
     def _headers_dict(resp) -> Dict[str, str]:
@@ -934,7 +1041,6 @@ def _run_image_edit_diagnostic() -> Dict[str, Any]:
             "request_body_bytes": len(_json.dumps(body).encode("utf-8")),
         }
         logger.info("[DEBUG time-image-edit] %s: starting POST model=%s", label, body.get("model"))
-        session = _req.Session()
         raw_data: Any = None
         t0 = time.time()
         try:
@@ -996,7 +1102,7 @@ def _run_image_edit_diagnostic() -> Dict[str, Any]:
     cdn_probe: Dict[str, Any] = {"url": fallback_cdn_image_url}
     t0 = time.time()
     try:
-        cdn_resp = _req.get(fallback_cdn_image_url, timeout=(10, 60), stream=True)
+        cdn_resp = session.get(fallback_cdn_image_url, timeout=(10, 60), stream=True)
         t_headers = time.time()
         cdn_bytes = cdn_resp.content
         t_body = time.time()
@@ -1052,10 +1158,9 @@ def _run_image_edit_diagnostic() -> Dict[str, Any]:
 
 @app.get("/api/debug/time-image-edit")
 def debug_time_image_edit():
-    return JSONResponse(_run_image_edit_diagnostic())
+    return ORJSONResponse(_run_image_edit_diagnostic())
 
 
-@app.on_event("startup")
 def _maybe_run_startup_diagnostic():
     if os.getenv("RUN_STARTUP_DIAGNOSTIC") != "1":
         return
@@ -1070,14 +1175,12 @@ def _maybe_run_startup_diagnostic():
 
 
 # --- AIV-78 observability: measure orphan rate without persisting state ---
-@app.on_event("startup")
 def _log_job_manager_startup():
     """Fresh-container marker. Pair with JOB_ORPHAN_SNAPSHOT and JOB_POLL_MISS
     to triangulate post-restart orphans in Replit logs."""
     logger.info("JOB_MANAGER_STARTUP pid=%s time=%s", os.getpid(), int(time.time()))
 
 
-@app.on_event("shutdown")
 def _log_job_orphan_snapshot():
     """List in-flight jobs at the moment uvicorn begins shutdown. Hard kills
     (SIGKILL from Replit) won't fire this; that case is caught by the
@@ -1118,25 +1221,16 @@ async def create_speech_to_video(
     _check_credits_or_402(user, cost)
 
     text = (prompt or "").strip()
-    tmp_path = None
     if not text and audio:
         try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(audio.filename or "")[1] or ".wav") as tmpf:
-                contents = await audio.read()
-                tmpf.write(contents)
-                tmp_path = tmpf.name
-        finally:
-            try:
-                await audio.close()
-            except Exception:
-                pass
-        try:
-            transcript = service.openai_client.transcribe(tmp_path)
+            audio.file.seek(0)
+            transcript = await run_in_threadpool(
+                service.openai_client.transcribe_stream, audio.file, audio.filename
+            )
             text = (transcript or {}).get("text", "").strip()
         finally:
             try:
-                if tmp_path and os.path.exists(tmp_path):
-                    os.remove(tmp_path)
+                await audio.close()
             except Exception:
                 pass
 
@@ -1175,7 +1269,7 @@ async def create_speech_to_video(
 
     start_job(job_id, run)
 
-    return JSONResponse({"job_id": job_id})
+    return ORJSONResponse({"job_id": job_id})
 
 # ----------------------------------------------------------------------
 # V2 generate template-video endpoint (AIV-15). Dispatcher in AIV-14.
@@ -1253,7 +1347,7 @@ def create_template_video(
         )
 
     start_job(job_id, run)
-    return JSONResponse({"job_id": job_id})
+    return ORJSONResponse({"job_id": job_id})
 
 
 # ----------------------------------------------------------------------
@@ -1323,7 +1417,7 @@ def list_published_templates(request: Request):
     inm = request.headers.get("if-none-match", "")
     if inm and inm == etag:
         return _Response(status_code=304, headers={"ETag": etag})
-    return JSONResponse(
+    return ORJSONResponse(
         {"templates": templates},
         headers={"ETag": etag, "Cache-Control": "public, max-age=60"},
     )
@@ -1449,9 +1543,6 @@ def delete_all_or_one_selfie(
     return {"deleted_count": deleted, "prefix": expected_prefix}
 
 
-_mount_static(app)
-
-
 if __name__ == "__main__":
     import uvicorn
 
@@ -1,25 +1,37 @@
 import argparse
+import functools
 import sys
 
-from .services.video_service import VideoService
+
+@functools.cache
+def _service():
+    """One VideoService per process — settings, HTTP sessions and clients are
+    built once even when main() is driven repeatedly from a script.
+
+    Deferred import: video_service transitively pulls in the OpenAI/AIMLAPI
+    client stack, which dominates CLI startup. Importing here keeps
+    parse-only invocations (--help, bad args) fast."""
+    from .services.video_service import VideoService
+
+    return VideoService()
 
 
 def _cmd_transcribe(args) -> int:
-    system = VideoService()
+    system = _service()
     result = system.openai_client.transcribe(args.audio)
     print(result.get("text", ""))
     return 0
 
 
 def _cmd_generate(args) -> int:
-    system = VideoService()
+    system = _service()
     result = system.generate_video(prompt=args.prompt, duration=args.duration, quality=args.quality)
     print(result)
     return 0 if result.get("success") else 1
 
 
 def _cmd_speech_to_video(args) -> int:
-    system = VideoService()
+    system = _service()
     result = system.speech_to_video_with_audio(audio_path=args.audio, duration=args.duration, quality=args.quality)
     print(result)
     return 0 if result.get("success") else 1
@@ -1,7 +1,10 @@
 import logging
+import os
+import random
+import re
+import time
 from typing import Any, Dict, List, Optional
 
-import os
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
@@ -10,11 +13,20 @@ from ..utils.config import Settings, get_settings
 
 logger = logging.getLogger(__name__)
 
+# Direct media links only, tolerating query strings. Compiled once — the URL
+# extractor runs it against every string in a provider response.
+_MEDIA_URL_RE = re.compile(r"\.(mp4|webm)(\?|$)", re.IGNORECASE)
+
 
 class AIMLAPIClient:
     def __init__(self, settings: Optional[Settings] = None):
         self.settings = settings or get_settings()
         self.base_url = self.settings.aimlapi_base_url.rstrip("/")
+        # Hot-path URLs built once; the methods only re-derive them when an
+        # explicit endpoint_path/status_path override is passed.
+        self._generate_url = f"{self.base_url}{self.settings.aimlapi_generate_path}"
+        self._status_url = f"{self.base_url}{self.settings.aimlapi_status_path}"
+        self._base_no_v2 = self.base_url.replace("/v2", "")
         # Separate sessions: POST (no retries), GET (with retries)
         self.session_post = requests.Session()
         self.session_get = requests.Session()
@@ -35,11 +47,51 @@ class AIMLAPIClient:
             allowed_methods=("GET",),
             raise_on_status=False,
         )
-        self.session_get.mount("https://", HTTPAdapter(max_retries=get_retry))
-        self.session_get.mount("http://", HTTPAdapter(max_retries=get_retry))
+        # Pools sized above the default of 10: concurrent scene generation
+        # fans several pollers at the same host, and an undersized pool makes
+        # urllib3 discard and reopen connections mid-poll.
+        pool_connections = int(os.getenv("AIMLAPI_POOL_CONNECTIONS", "20"))
+        pool_maxsize = int(os.getenv("AIMLAPI_POOL_MAXSIZE", "50"))
+        get_adapter = HTTPAdapter(
+            max_retries=get_retry,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=False,
+        )
+        self.session_get.mount("https://", get_adapter)
+        self.session_get.mount("http://", get_adapter)
         # POST: no automatic HTTP retries (we handle minimal retry manually)
-        self.session_post.mount("https://", HTTPAdapter(max_retries=Retry(total=0)))
-        self.session_post.mount("http://", HTTPAdapter(max_retries=Retry(total=0)))
+        post_adapter = HTTPAdapter(
+            max_retries=Retry(total=0),
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=False,
+        )
+        self.session_post.mount("https://", post_adapter)
+        self.session_post.mount("http://", post_adapter)
+        # Opt-in status cache (see get_status ttl_ms): coalesces identical polls
+        # from concurrent scene workers into one network round trip.
+        self._status_cache: Dict[tuple, tuple] = {}
+        # Remembers which fallback status path answered for a job_id so the
+        # poll loop stops re-probing dead endpoints every interval.
+        self._resolved_status_path: Dict[str, str] = {}
+        # Parse retry/timeout knobs once — these sat inside the per-attempt
+        # loops as os.getenv + cast on every HTTP call.
+        self._post_attempts = int(os.getenv("AIMLAPI_POST_ATTEMPTS", "2"))
+        self._status_attempts = int(os.getenv("AIMLAPI_STATUS_ATTEMPTS", "2"))
+        self._connect_to = float(os.getenv("AIMLAPI_CONNECT_TIMEOUT", "10"))
+        self._read_to = float(os.getenv("AIMLAPI_READ_TIMEOUT", "45"))
+        self._status_read_to = float(os.getenv("AIMLAPI_STATUS_READ_TIMEOUT", "30"))
+        self._image_read_to = float(os.getenv("AIMLAPI_IMAGE_READ_TIMEOUT", "120"))
+        self._poll_min_interval = float(os.getenv("AIMLAPI_POLL_MIN_INTERVAL_SECONDS", "1"))
+        self._poll_backoff_base = float(os.getenv("AIMLAPI_POLL_BACKOFF_BASE", "1.3"))
+        # Raw strings: their defaults depend on per-call arguments.
+        self._max_wait_env = os.getenv("AIMLAPI_MAX_WAIT_SECONDS")
+        # Legacy fixed-interval knob maps onto the backoff ceiling so existing
+        # deployments that tuned it keep their effective polling rate.
+        self._poll_max_interval_env = os.getenv("AIMLAPI_POLL_MAX_INTERVAL_SECONDS") or os.getenv(
+            "AIMLAPI_POLL_INTERVAL_SECONDS"
+        )
 
     def generate_video(
         self,
@@ -58,9 +110,7 @@ class AIMLAPIClient:
         POST {base_url}/generate/video/google/generation
         Body: {"model": "alibaba/wan2.1-t2v-turbo", "prompt": "..."}
         """
-        import time
-
-        url = f"{self.base_url.rstrip('/')}{(endpoint_path or self.settings.aimlapi_generate_path)}"
+        url = f"{self.base_url}{endpoint_path}" if endpoint_path else self._generate_url
         body: Dict[str, Any] = {
             "model": model or "alibaba/wan2.1-t2v-turbo",
             "prompt": prompt,
@@ -77,20 +127,46 @@ class AIMLAPIClient:
         if generate_audio is not None:
             body["generate_audio"] = bool(generate_audio)
 
+        return self._request(
+            self.session_post, "POST", url,
+            json_body=body, attempts=self._post_attempts, read_to=self._read_to,
+        )
+
+    def _request(
+        self,
+        sess: requests.Session,
+        method: str,
+        url: str,
+        *,
+        json_body: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        attempts: int,
+        read_to: float,
+    ) -> Dict[str, Any]:
+        """Shared retry-with-backoff loop for AIMLAPI calls.
+
+        Returns the decoded payload with _status_code/_attempt_url injected.
+        Retries on 429/5xx/transport errors with a doubling 1s backoff; any
+        other status returns immediately. JSON is only decoded when the
+        response declares it, and error bodies are truncated to bound memory.
+        """
         last: Dict[str, Any] = {}
-        attempts = int(os.getenv("AIMLAPI_POST_ATTEMPTS", "2"))
         backoff = 1.0
         for _ in range(attempts):
             try:
-                connect_to = float(os.getenv("AIMLAPI_CONNECT_TIMEOUT", "10"))
-                read_to = float(os.getenv("AIMLAPI_READ_TIMEOUT", "45"))
-                resp = self.session_post.post(url, json=body, timeout=(connect_to, read_to))
-                try:
-                    data = resp.json()
-                except Exception:
-                    data = {"error": resp.text}
+                resp = sess.request(
+                    method, url, json=json_body, params=params,
+                    timeout=(self._connect_to, read_to),
+                )
+                if "json" in resp.headers.get("Content-Type", ""):
+                    try:
+                        data = resp.json()
+                    except Exception:
+                        data = {"error": resp.text[:2048]}
+                else:
+                    data = {"error": resp.text[:2048]}
                 data["_status_code"] = resp.status_code
-                data["_attempt_url"] = url
+                data["_attempt_url"] = resp.url
                 if resp.status_code not in {429} and resp.status_code < 500:
                     return data
                 last = data
@@ -102,94 +178,120 @@ class AIMLAPIClient:
             backoff *= 2.0
         return last or {"error": "No response", "_status_code": 0}
 
-    def get_status(self, job_id: str, status_path: Optional[str] = None) -> Dict[str, Any]:
+    def get_status(self, job_id: str, status_path: Optional[str] = None, ttl_ms: int = 0) -> Dict[str, Any]:
         """
         Poll generation using AIMLAPI v2 endpoint:
         GET {base_url}/generate/video/google/generation?generation_id={id}
+
+        ttl_ms > 0 serves a recent cached payload for the same
+        (job_id, status_path) instead of re-querying — useful when several
+        callers poll the same job inside one backoff window. Terminal states
+        are never served from cache.
         """
-        import time
+        cache_key = (str(job_id), status_path or "")
+        if ttl_ms > 0:
+            cached = self._status_cache.get(cache_key)
+            if cached and (time.monotonic() - cached[0]) < ttl_ms / 1000.0:
+                return cached[1]
 
         # Support both query style and REST style (e.g., /video/generations/{id})
-        base = self.base_url.rstrip('/')
         if status_path and "{id}" in status_path:
             jid = str(job_id)
             # Some providers return IDs like "<uuid>:<model>"; REST paths expect the UUID only
             id_only = jid.split(":")[0]
-            url = f"{base}{status_path.format(id=id_only)}"
+            url = f"{self.base_url}{status_path.format(id=id_only)}"
             params = None
         else:
-            url = f"{base}{(status_path or self.settings.aimlapi_status_path)}"
+            url = f"{self.base_url}{status_path}" if status_path else self._status_url
             params = {self.settings.aimlapi_status_query_param: job_id}
-        last: Dict[str, Any] = {}
-        attempts = int(os.getenv("AIMLAPI_STATUS_ATTEMPTS", "2"))
-        backoff = 1.0
-        for _ in range(attempts):
-            try:
-                connect_to = float(os.getenv("AIMLAPI_CONNECT_TIMEOUT", "10"))
-                read_to = float(os.getenv("AIMLAPI_STATUS_READ_TIMEOUT", "30"))
-                if params is None:
-                    resp = self.session_get.get(url, timeout=(connect_to, read_to))
-                else:
-                    resp = self.session_get.get(url, params=params, timeout=(connect_to, read_to))
-                try:
-                    data = resp.json()
-                except Exception:
-                    data = {"error": resp.text}
-                data["_status_code"] = resp.status_code
-                data["_attempt_url"] = resp.url
-                if resp.status_code not in {429} and resp.status_code < 500:
-                    return data
-                last = data
-            except requests.Timeout as e:
-                last = {"error": f"timeout: {e}", "_status_code": 0, "_attempt_url": url}
-            except requests.RequestException as e:
-                last = {"error": f"request_error: {e}", "_status_code": 0, "_attempt_url": url}
-            time.sleep(backoff)
-            backoff *= 2.0
-        return last or {"error": "No response", "_status_code": 0}
+        data = self._request(
+            self.session_get, "GET", url,
+            params=params, attempts=self._status_attempts, read_to=self._status_read_to,
+        )
+        code = int(data.get("_status_code", 0) or 0)
+        if code and code != 429 and code < 500:
+            state = str(data.get("status") or "").lower()
+            if state in {"completed", "succeeded", "finished", "failed", "error"}:
+                self._status_cache.pop(cache_key, None)
+            elif ttl_ms > 0:
+                # Only opted-in callers populate the cache; unconditional
+                # writes would accrue entries no one ever reads back.
+                self._status_cache[cache_key] = (time.monotonic(), data)
+        return data
 
     def poll_until_complete(self, job_id: str, max_wait: int = 600, interval: int = 5, status_path: Optional[str] = None) -> Dict[str, Any]:
-        import time
-
-        env_max = int(os.getenv("AIMLAPI_MAX_WAIT_SECONDS", str(max_wait)))
-        env_int = int(os.getenv("AIMLAPI_POLL_INTERVAL_SECONDS", str(interval)))
-        max_wait = env_max
-        interval = env_int
-        start = time.time()
-        while time.time() - start < max_wait:
-            status = self.get_status(job_id, status_path=status_path)
-            state = str(status.get("status") or "").lower()
-            # Fallbacks for providers that don't support REST GET yet
-            if status.get("_status_code") == 404:
-                # Try query-style on /video/generations
-                try:
-                    qstatus = self.get_status(job_id, status_path="/video/generations")
-                    if qstatus and int(qstatus.get("_status_code", 0)) < 400:
-                        status = qstatus
-                        state = str(status.get("status") or "").lower()
-                    else:
-                        # Try legacy google status endpoint
-                        qstatus2 = self.get_status(job_id, status_path="/generate/video/google/generation")
-                        if qstatus2 and int(qstatus2.get("_status_code", 0)) < 400:
-                            status = qstatus2
+        if self._max_wait_env:
+            max_wait = int(self._max_wait_env)
+        # Exponential schedule with jitter: poll quickly while the job is young
+        # (short jobs are detected within a second or two), then back off toward
+        # max_interval so long generations don't hammer the status endpoint.
+        # Jitter spreads concurrent pollers so they don't align into bursts.
+        min_interval = self._poll_min_interval
+        max_interval = float(self._poll_max_interval_env) if self._poll_max_interval_env else float(max(10, interval))
+        backoff_base = self._poll_backoff_base
+        poll_n = 0
+
+        def _sleep_backoff() -> None:
+            nonlocal poll_n
+            # Jitter before the clamp so the sleep never exceeds max_interval
+            delay = min(max_interval, min_interval * (backoff_base ** poll_n) * random.uniform(0.5, 1.5))
+            poll_n += 1
+            time.sleep(delay)
+
+        jid = str(job_id)
+        # Monotonic deadline: immune to NTP/wall-clock jumps and one clock
+        # read per iteration instead of two.
+        deadline = time.monotonic() + max_wait
+        try:
+            while time.monotonic() < deadline:
+                # Once a fallback path has answered for this job, poll it directly
+                # instead of re-probing the 404ing primary every iteration.
+                effective_path = self._resolved_status_path.get(jid, status_path)
+                status = self.get_status(job_id, status_path=effective_path)
+                state = str(status.get("status") or "").lower()
+                # Fallbacks for providers that don't support REST GET yet
+                if status.get("_status_code") == 404:
+                    # Try query-style on /video/generations
+                    try:
+                        qstatus = self.get_status(job_id, status_path="/video/generations")
+                        if qstatus and int(qstatus.get("_status_code", 0)) < 400:
+                            status = qstatus
                             state = str(status.get("status") or "").lower()
-                except Exception:
-                    pass
-                if status.get("_status_code") == 404 and not status.get("status"):
-                    time.sleep(interval)
+                            self._resolved_status_path[jid] = "/video/generations"
+                        else:
+                            # Try legacy google status endpoint
+                            qstatus2 = self.get_status(job_id, status_path="/generate/video/google/generation")
+                            if qstatus2 and int(qstatus2.get("_status_code", 0)) < 400:
+                                status = qstatus2
+                                state = str(status.get("status") or "").lower()
+                                self._resolved_status_path[jid] = "/generate/video/google/generation"
+                    except Exception:
+                        pass
+                    if status.get("_status_code") == 404 and not status.get("status"):
+                        _sleep_backoff()
+                        continue
+                if state in {"failed", "error"}:
+                    return status
+                # common in-progress states from sample
+                if state in {"waiting", "active", "queued", "generating"}:
+                    _sleep_backoff()
                     continue
-            if state in {"failed", "error"}:
-                return status
-            # common in-progress states from sample
-            if state in {"waiting", "active", "queued", "generating"}:
-                time.sleep(interval)
-                continue
-            # If status is something else or a URL is present, treat as done
-            url = self._extract_video_url(status)
-            if url or state in {"completed", "succeeded", "finished"}:
-                return status
-            time.sleep(interval)
-        return {"status": "timeout", "error": "Generation timed out", "last_seen": status if 'status' in locals() else None}
+                # If status is something else or a URL is present, treat as done
+                url = self._extract_video_url(status)
+                if url or state in {"completed", "succeeded", "finished"}:
+                    return status
+                _sleep_backoff()
+            return {"status": "timeout", "error": "Generation timed out", "last_seen": status if 'status' in locals() else None}
+        finally:
+            # Evict this job's cached status on every exit path — deadline
+            # timeouts, 404 exits, and exceptions never produce the terminal
+            # payload that would otherwise clear it, and a long-running server
+            # must not accrue one stale entry per abandoned job.
+            for key in [k for k in self._status_cache if k[0] == jid]:
+                self._status_cache.pop(key, None)
+            # Same lifetime for the fallback-path memo: it only matters while
+            # this poll is running, one entry per job otherwise.
+            self._resolved_status_path.pop(jid, None)
 
     def generate_image_to_video(
         self,
@@ -205,9 +307,7 @@ class AIMLAPIClient:
         Generate a video from an image (and optionally a last-frame image).
         Supports Hailuo, Kling, Seedance, and other AIMLAPI I2V models.
         """
-        import time
-
-        base = self.settings.aimlapi_base_url.rstrip("/").replace("/v2", "")
+        base = self._base_no_v2
         resolved_model = model or self.settings.i2v_model
         is_hailuo = "hailuo" in resolved_model.lower() or "minimax" in resolved_model.lower()
         is_seedance = "seedance" in resolved_model.lower()
@@ -249,30 +349,10 @@ class AIMLAPIClient:
                 body["generate_audio"] = False
                 body["duration"] = 3
 
-        last: Dict[str, Any] = {}
-        attempts = int(os.getenv("AIMLAPI_POST_ATTEMPTS", "2"))
-        backoff = 1.0
-        for _ in range(attempts):
-            try:
-                connect_to = float(os.getenv("AIMLAPI_CONNECT_TIMEOUT", "10"))
-                read_to = float(os.getenv("AIMLAPI_READ_TIMEOUT", "45"))
-                resp = self.session_post.post(url, json=body, timeout=(connect_to, read_to))
-                try:
-                    data = resp.json()
-                except Exception:
-                    data = {"error": resp.text}
-                data["_status_code"] = resp.status_code
-                data["_attempt_url"] = url
-                if resp.status_code not in {429} and resp.status_code < 500:
-                    return data
-                last = data
-            except requests.Timeout as e:
-                last = {"error": f"timeout: {e}", "_status_code": 0, "_attempt_url": url}
-            except requests.RequestException as e:
-                last = {"error": f"request_error: {e}", "_status_code": 0, "_attempt_url": url}
-            time.sleep(backoff)
-            backoff *= 2.0
-        return last or {"error": "No response", "_status_code": 0}
+        return self._request(
+            self.session_post, "POST", url,
+            json_body=body, attempts=self._post_attempts, read_to=self._read_to,
+        )
 
     def generate_and_poll_i2v(
         self,
@@ -332,8 +412,7 @@ class AIMLAPIClient:
         Stage 1 (T2I): prompt only, model=google/nano-banana-pro
         Stages 2+ (Edit): prompt + image_urls, model=google/nano-banana-pro-edit
         """
-        base = self.settings.aimlapi_base_url.rstrip("/").replace("/v2", "")
-        url = f"{base}/v1/images/generations"
+        url = f"{self._base_no_v2}/v1/images/generations"
 
         if model is None:
             model = self.settings.nano_banana_edit_model if image_urls else self.settings.nano_banana_t2i_model
@@ -351,19 +430,22 @@ class AIMLAPIClient:
         logger.info("[AIMLAPI] generate_image POST %s model=%s image_urls=%s", url, model, bool(image_urls))
         logger.debug("[AIMLAPI] generate_image body: %s", {k: v for k, v in body.items() if k != "prompt"})
 
-        import time
         last: Dict[str, Any] = {}
-        attempts = int(os.getenv("AIMLAPI_POST_ATTEMPTS", "2"))
+        attempts = self._post_attempts
         backoff = 1.0
         for _ in range(attempts):
             try:
-                connect_to = float(os.getenv("AIMLAPI_CONNECT_TIMEOUT", "10"))
-                read_to = float(os.getenv("AIMLAPI_IMAGE_READ_TIMEOUT", "120"))
-                resp = self.session_post.post(url, json=body, timeout=(connect_to, read_to))
-                try:
-                    data = resp.json()
-                except Exception:
-                    data = {"error": resp.text}
+                resp = self.session_post.post(url, json=body, timeout=(self._connect_to, self._image_read_to))
+                # Only attempt JSON decode when the server says it's JSON —
+                # 5xx HTML error pages otherwise get parsed just to fail.
+                # Error bodies are truncated to bound memory on junk responses.
+                if "json" in resp.headers.get("Content-Type", ""):
+                    try:
+                        data = resp.json()
+                    except Exception:
+                        data = {"error": resp.text[:2048]}
+                else:
+                    data = {"error": resp.text[:2048]}
                 data["_status_code"] = resp.status_code
                 logger.info("[AIMLAPI] generate_image response: status=%s", resp.status_code)
                 logger.debug("[AIMLAPI] generate_image raw response: %s", data)
@@ -418,37 +500,22 @@ class AIMLAPIClient:
         """Extract a playable media URL from provider responses.
         Avoid returning provider status/API URLs (e.g., /generation?...).
         """
-        from urllib.parse import urlparse
-
-        urls: list[str] = []
-
         def _walk(obj):
-            if isinstance(obj, str) and obj.startswith("http"):
-                urls.append(obj)
-                return
-            if isinstance(obj, dict):
+            if isinstance(obj, str):
+                if obj.startswith("http"):
+                    yield obj
+            elif isinstance(obj, dict):
                 for v in obj.values():
-                    _walk(v)
+                    yield from _walk(v)
             elif isinstance(obj, list):
                 for it in obj:
-                    _walk(it)
-
-        _walk(data)
+                    yield from _walk(it)
 
-        if not urls:
-            return None
-        # Strict: only return direct media links (tolerate query strings)
-        for u in urls:
-            try:
-                from urllib.parse import urlparse
-                path = urlparse(u).path.lower()
-                if path.endswith(".mp4") or path.endswith(".webm"):
-                    return u
-            except Exception:
-                pass
-            lu = u.lower()
-            import re
-            if re.search(r"\.(mp4|webm)(\?|$)", lu):
+        # Strict: only return direct media links (tolerate query strings).
+        # Lazy walk — stops at the first match instead of collecting every
+        # URL in the payload first.
+        for u in _walk(data):
+            if _MEDIA_URL_RE.search(u):
                 return u
         return None
 
@@ -19,6 +19,9 @@ class OpenAIClient:
             organization=self.settings.openai_org_id or None,
             project=self.settings.openai_project or None,
         )
+        # Scene breakdowns are deterministic enough to reuse: a resubmitted or
+        # retried prompt shouldn't pay a second multi-second LLM round trip.
+        self._scene_cache: Dict[tuple, List[Dict[str, object]]] = {}
 
     def transcribe(self, audio_path: str) -> Dict[str, str]:
         """
@@ -27,22 +30,35 @@ class OpenAIClient:
         Returns a dict with key "text".
         """
         with open(audio_path, "rb") as f:
-            data = f.read()
+            return self.transcribe_stream(f, filename=os.path.basename(audio_path) or "audio.wav")
 
-        # Prepare an in-memory stream with a filename to help multipart form encoding
-        def _make_stream() -> io.BytesIO:
-            bio = io.BytesIO(data)
-            # Provide a name attribute so the SDK sets a filename in multipart
-            bio.name = os.path.basename(audio_path) or "audio.wav"
-            return bio
+    def transcribe_stream(self, fileobj, filename: Optional[str] = None) -> Dict[str, str]:
+        """
+        Transcribe from an open binary file-like object (e.g. an UploadFile's
+        spooled temp file) without requiring a disk round trip for the caller.
+        Same retry behavior as transcribe().
+        """
+        name = filename or getattr(fileobj, "name", None)
+        if not isinstance(name, str) or not name:
+            name = "audio.wav"
+
+        # Seekable sources (disk files, spooled uploads) are streamed as-is and
+        # rewound between retries, so the recording is never duplicated in
+        # memory. Only non-seekable streams get buffered into a BytesIO.
+        try:
+            seekable = fileobj.seekable()
+        except Exception:
+            seekable = False
+        stream = fileobj if seekable else io.BytesIO(fileobj.read())
 
         backoff_seconds = 1.0
         last_err: Optional[Exception] = None
         for _ in range(3):
             try:
+                stream.seek(0)
                 transcript = self.client.audio.transcriptions.create(
                     model=self.settings.openai_transcribe_model,
-                    file=_make_stream(),
+                    file=(name, stream),
                 )
                 text = getattr(transcript, "text", None)
                 if text is None and isinstance(transcript, dict):
@@ -71,6 +87,11 @@ class OpenAIClient:
         """
         Ask Chat Completions API to propose a coherent scene breakdown.
         """
+        cache_key = (base_prompt, int(total_duration), self.settings.openai_chat_model)
+        cached = self._scene_cache.get(cache_key)
+        if cached is not None:
+            return [dict(s) for s in cached]
+
         num_scenes = max(1, total_duration // 10)
         response = self.client.chat.completions.create(
             model=self.settings.openai_chat_model,
@@ -96,6 +117,9 @@ class OpenAIClient:
         if not scenes:
             scenes.append({"prompt": base_prompt, "duration": total_duration})
 
+        if len(self._scene_cache) >= 128:
+            self._scene_cache.pop(next(iter(self._scene_cache)))
+        self._scene_cache[cache_key] = [dict(s) for s in scenes]
         return scenes
 
     def generate_scene_bible_and_stages(
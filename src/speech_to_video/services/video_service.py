@@ -1,4 +1,5 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable, Dict, List, Optional
 
 from ..clients.openai_client import OpenAIClient
@@ -11,6 +12,16 @@ from ..utils.video import stitch_videos
 
 logger = logging.getLogger(__name__)
 
+def _is_media_url(u: Optional[str]) -> bool:
+    """True when the URL points directly at an mp4/webm file."""
+    if not u:
+        return False
+    # Cheap suffix test on the pre-query tail; avoids a full urlparse
+    # (ParseResult allocation + whole-path lowercase) per candidate URL.
+    q = u.find("?")
+    tail = u[:q] if q >= 0 else u
+    return tail[-5:].lower().endswith((".mp4", ".webm"))
+
 
 class VideoService:
     def __init__(self, settings: Optional[Settings] = None):
@@ -77,20 +88,7 @@ class VideoService:
                 video_url = None
 
         # Only treat as success when we have a direct media URL (mp4/webm)
-        def _is_media(u: Optional[str]) -> bool:
-            if not u:
-                return False
-            try:
-                from urllib.parse import urlparse
-                path = urlparse(u).path.lower()
-                return path.endswith(".mp4") or path.endswith(".webm")
-            except Exception:
-                lu = u.lower()
-                # Fallback check that tolerates query strings
-                import re
-                return bool(re.search(r"\.(mp4|webm)(\?|$)", lu))
-
-        is_media = _is_media(video_url)
+        is_media = _is_media_url(video_url)
         if data.get("status") in {"completed", "succeeded", "finished"} and not is_media:
             # Provider finished but didn't return a media URL yet
             return {"success": False, "error": data, "status_code": int(data.get("_status_code", status_code) or status_code)}
@@ -101,12 +99,20 @@ class VideoService:
 
     def _multi_generation(self, prompt: str, total_duration: int, quality: str) -> Dict:
         scenes = self.openai_client.create_scene_progression(prompt, total_duration)
-        video_segments: List[str] = []
 
-        for idx, scene in enumerate(scenes):
+        # Scenes are independent until stitching, so generate them concurrently
+        # instead of paying each poll-to-completion serially. Wall-clock drops
+        # to roughly the slowest scene. map() preserves scene order.
+        def _gen_scene(scene: Dict) -> Dict:
             scene_prompt = scene.get("prompt", prompt)
             scene_duration = int(scene.get("duration", 10))
-            result = self._single_generation(scene_prompt, scene_duration, quality)
+            return self._single_generation(scene_prompt, scene_duration, quality)
+
+        with ThreadPoolExecutor(max_workers=min(len(scenes), 4) or 1) as pool:
+            results = list(pool.map(_gen_scene, scenes))
+
+        video_segments: List[str] = []
+        for result in results:
             if not result.get("success"):
                 return result
             if result.get("video_url"):
@@ -3,15 +3,33 @@ import json
 import shutil
 import time
 import re
+from functools import lru_cache
 from typing import List, Dict, Optional
 
+try:
+    # Same optional speedup the API layer gets from ORJSONResponse
+    import orjson
+except Exception:
+    orjson = None
+
+
+# Directories already created this process — skips the stat syscall
+# os.makedirs(exist_ok=True) pays on every playlist read/write.
+_ENSURED_DIRS: set = set()
+
+
+def _ensure_dir(path: str) -> str:
+    if path not in _ENSURED_DIRS:
+        os.makedirs(path, exist_ok=True)
+        _ENSURED_DIRS.add(path)
+    return path
+
 
 def _base_dir() -> str:
     base_dir = os.getenv("CLIPS_DIR")
     if not base_dir:
         base_dir = os.path.join(os.path.abspath(os.getcwd()), "clips")
-    os.makedirs(base_dir, exist_ok=True)
-    return base_dir
+    return _ensure_dir(base_dir)
 
 
 def _sanitize_segment(seg: str) -> str:
@@ -20,31 +38,60 @@ def _sanitize_segment(seg: str) -> str:
     return seg or "default"
 
 
-def _playlist_path(namespace: Optional[str] = None) -> str:
-    base = _base_dir()
+@lru_cache(maxsize=64)
+def _resolve_playlist_path(base: str, namespace: Optional[str]) -> str:
     if namespace:
-        ns = _sanitize_segment(namespace)
-        ns_dir = os.path.join(base, ns)
-        os.makedirs(ns_dir, exist_ok=True)
+        ns_dir = _ensure_dir(os.path.join(base, _sanitize_segment(namespace)))
         return os.path.join(ns_dir, "playlist.json")
     return os.path.join(base, "playlist.json")
 
 
+def _playlist_path(namespace: Optional[str] = None) -> str:
+    return _resolve_playlist_path(_base_dir(), namespace)
+
+
+# Parsed playlists keyed by path, invalidated via mtime. Playlists are
+# small, but list_clips runs on every gallery poll — skip the re-parse
+# when the file hasn't changed. Lists are copied on both store and return
+# so callers can't mutate the cached copy.
+_PLAYLIST_CACHE: Dict[str, tuple] = {}
+
+
 def _load(namespace: Optional[str] = None) -> List[Dict]:
     path = _playlist_path(namespace)
-    if not os.path.exists(path):
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
         return []
+    cached = _PLAYLIST_CACHE.get(path)
+    if cached and cached[0] == mtime:
+        return list(cached[1])
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return data or []
+        with open(path, "rb") as f:
+            raw = f.read()
+        data = (orjson.loads(raw) if orjson else json.loads(raw)) or []
     except Exception:
         return []
+    _PLAYLIST_CACHE[path] = (mtime, list(data))
+    return data
 
 
 def _save(items: List[Dict], namespace: Optional[str] = None) -> None:
-    with open(_playlist_path(namespace), "w", encoding="utf-8") as f:
-        json.dump(items, f, ensure_ascii=False, indent=2)
+    path = _playlist_path(namespace)
+    if orjson:
+        payload = orjson.dumps(items, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(items, ensure_ascii=False, indent=2).encode("utf-8")
+    # Atomic replace: a crash mid-write must not leave a truncated playlist,
+    # which _load would silently treat as empty.
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+    try:
+        _PLAYLIST_CACHE[path] = (os.stat(path).st_mtime_ns, list(items))
+    except OSError:
+        _PLAYLIST_CACHE.pop(path, None)
 
 
 def add_clip(url: str, note: Optional[str] = None, namespace: Optional[str] = None, json_response: Optional[str] = None) -> Dict:
@@ -65,8 +112,7 @@ def _response_dir(namespace: Optional[str] = None) -> str:
         d = os.path.join(base, ns, "responses")
     else:
         d = os.path.join(base, "responses")
-    os.makedirs(d, exist_ok=True)
-    return d
+    return _ensure_dir(d)
 
 
 def _save_response(ts: int, json_response: str, namespace: Optional[str] = None) -> str:
@@ -104,16 +150,13 @@ def reorder_clips(order_ts: List[int], namespace: Optional[str] = None) -> List[
     new_items: List[Dict] = []
     seen = set()
     for ts in order_ts:
-        it = ts_to_item.get(int(ts))
-        if it and int(it.get("ts", 0)) not in seen:
-            new_items.append(it)
-            seen.add(int(it.get("ts", 0)))
-    # append any not referenced
-    for it in items:
-        t = int(it.get("ts", 0))
-        if t not in seen:
+        t = int(ts)
+        it = ts_to_item.get(t)
+        if it is not None and t not in seen:
             new_items.append(it)
             seen.add(t)
+    # append any not referenced, in their existing order
+    new_items.extend(it for it in items if int(it.get("ts", 0)) not in seen)
     _save(new_items, namespace)
     return new_items
 
@@ -153,6 +196,12 @@ def delete_namespace(namespace: str) -> bool:
     if not os.path.isdir(ns_dir):
         return False
     shutil.rmtree(ns_dir)
+    # Forget ensured dirs and cached paths under the deleted tree so a later
+    # write recreates the directory instead of failing on open()
+    _ENSURED_DIRS.difference_update(
+        {p for p in _ENSURED_DIRS if p == ns_dir or p.startswith(ns_dir + os.sep)}
+    )
+    _resolve_playlist_path.cache_clear()
     return True
 
 
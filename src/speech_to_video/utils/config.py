@@ -1,5 +1,6 @@
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 
 try:
@@ -11,7 +12,7 @@ except Exception:
     pass
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Settings:
     openai_api_key: str = os.environ.get("OPENAI_API_KEY", "")
     openai_org_id: str = os.environ.get("OPENAI_ORG_ID", "")
@@ -65,7 +66,12 @@ class Settings:
     nbp_model: str = os.environ.get("NBP_MODEL", "gemini-3-pro-image-preview")
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
+    # Singleton: every component sees the same env snapshot. Note the field
+    # defaults above are evaluated at class creation (module import), so
+    # re-reading a changed environment requires reloading this module, not
+    # just get_settings.cache_clear().
     return Settings()
 
 
@@ -1,113 +1,472 @@
 import logging
 import os
+import re
 import shutil
 import subprocess
 import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Dict, Any, Tuple, Union
 
 import requests
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
-
-def _unique_stitched_path() -> str:
-    """Return a unique path like clips/stitched/stitched-{timestamp}.mp4"""
-    stitched_dir = os.path.join(os.path.abspath(os.getcwd()), "clips", "stitched")
-    os.makedirs(stitched_dir, exist_ok=True)
-    filename = f"stitched-{int(time.time())}.mp4"
-    return os.path.join(stitched_dir, filename)
+# Shared keep-alive session for segment downloads: concurrent fetches reuse
+# pooled connections instead of opening a TLS socket per segment. Retries
+# absorb flaky CDN edges without failing the whole stitch.
+_DL_SESSION = requests.Session()
+_dl_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+    ),
+)
+_DL_SESSION.mount("https://", _dl_adapter)
+_DL_SESSION.mount("http://", _dl_adapter)
+
+# 1 MiB: segment downloads are bandwidth-bound; tiny chunks just multiply
+# Python-level iterations and write syscalls.
+_DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+
+def _scratch_dir(prefix: str) -> str:
+    """mkdtemp for stitch scratch space, preferring RAM-backed storage.
+
+    STITCH_TMPDIR overrides the location outright; otherwise /dev/shm is
+    used when present with >2 GiB free, so segment bytes never touch disk
+    between download and mux. Falls back to the default tempdir."""
+    base = os.getenv("STITCH_TMPDIR")
+    if not base and os.path.isdir("/dev/shm"):
+        try:
+            if shutil.disk_usage("/dev/shm").free > (2 << 30):
+                base = "/dev/shm"
+        except Exception:
+            base = None
+    return tempfile.mkdtemp(prefix=prefix, dir=base or None)
 
 
-def stitch_videos(video_urls: List[str]) -> Optional[str]:
-    """
-    Stitch remote video URLs into a single local file using moviepy if available.
-    Falls back to returning the first URL if stitching is unavailable or fails.
-    """
-    if not video_urls:
-        return None
+def _download_segments(sources: List[str], temp_dir: str) -> List[str]:
+    """Fetch every segment source into temp_dir, concurrently for multiple
+    sources, returning local paths in source order. Accepts http(s) URLs or
+    local file paths (copied). Raises on any failed source."""
+    local_paths = [os.path.join(temp_dir, f"segment_{i}.mp4") for i in range(len(sources))]
 
+    def _fetch(idx: int) -> str:
+        src = sources[idx]
+        if src.startswith("http"):
+            with _DL_SESSION.get(src, stream=True, timeout=120) as r:
+                r.raise_for_status()
+                with open(local_paths[idx], "wb") as f:
+                    for chunk in r.iter_content(chunk_size=_DOWNLOAD_CHUNK_SIZE):
+                        if chunk:
+                            f.write(chunk)
+        elif os.path.isfile(src):
+            shutil.copy2(src, local_paths[idx])
+        else:
+            raise ValueError(f"Invalid video source: {src}")
+        return local_paths[idx]
+
+    if len(sources) <= 1:
+        for i in range(len(sources)):
+            _fetch(i)
+    else:
+        with ThreadPoolExecutor(max_workers=min(len(sources), 8)) as pool:
+            list(pool.map(_fetch, range(len(sources))))
+    return local_paths
+
+
+@lru_cache(maxsize=1)
+def _moviepy():
+    """Import moviepy once per process.
+
+    Returns (VideoFileClip, concatenate_videoclips) on success or the import
+    exception on failure. The import is heavy (seconds), so it stays off the
+    module import path — the server pulls this module in at startup — but
+    stitchers no longer re-run the try/except machinery per call."""
     try:
         from moviepy import VideoFileClip, concatenate_videoclips
+        return VideoFileClip, concatenate_videoclips
+    except Exception as e:
+        return e
+
+
+@lru_cache(maxsize=1)
+def _nvenc_available() -> bool:
+    """Probe the bundled ffmpeg once per process for the h264_nvenc encoder.
+
+    Listing encoders is cheap but not free (~100ms of subprocess spawn), so
+    the verdict is cached; hardware doesn't appear mid-process."""
+    try:
+        from imageio_ffmpeg import get_ffmpeg_exe
+        proc = subprocess.run(
+            [get_ffmpeg_exe(), "-hide_banner", "-encoders"],
+            capture_output=True,
+            text=True,
+            timeout=15,
+        )
+        return "h264_nvenc" in (proc.stdout or "")
+    except Exception:
+        return False
+
+
+def _remove_quiet(path: str) -> None:
+    try:
+        if os.path.exists(path):
+            os.remove(path)
+    except Exception:
+        pass
+
+
+def _concat_stream_copy(sources: List[str], output_path: str) -> bool:
+    """Concatenate same-codec segments without re-encoding via the ffmpeg
+    concat demuxer (-c copy). Returns True on success; False when ffmpeg is
+    unavailable or exits nonzero, letting callers fall back to the moviepy
+    re-encode. Stream copy skips decode + libx264 entirely, which is 10-50x
+    faster than the moviepy path and lossless.
+
+    Sources may be local paths or http(s) URLs; remote entries are fetched by
+    ffmpeg itself, so segments never hit local disk before the mux."""
+    try:
+        from imageio_ffmpeg import get_ffmpeg_exe
+        ffmpeg_bin = get_ffmpeg_exe()
+    except Exception:
+        return False
+
+    list_path = output_path + ".segments.txt"
+    remote = any(s.startswith("http") for s in sources)
+    try:
+        with open(list_path, "w", encoding="utf-8") as f:
+            for s in sources:
+                entry = s if s.startswith("http") else os.path.abspath(s)
+                f.write(f"file '{entry}'\n")
+        cmd = [ffmpeg_bin, "-y", "-f", "concat", "-safe", "0"]
+        if remote:
+            cmd += ["-protocol_whitelist", "file,http,https,tcp,tls"]
+        cmd += ["-i", list_path, "-c", "copy", output_path]
+        proc = subprocess.run(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=False,
+        )
+        if proc.returncode != 0:
+            tail = proc.stderr.decode("utf-8", errors="replace").strip().splitlines()[-5:]
+            logger.info("Stitch: concat demuxer fast path failed, falling back to re-encode: %s", " | ".join(tail))
+            _remove_quiet(output_path)
+            return False
+        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+            return True
+        _remove_quiet(output_path)
+        return False
+    except Exception:
+        # A mid-transfer drop (remote sources) leaves a truncated file —
+        # callers gate on the return value, so never leave it behind.
+        _remove_quiet(output_path)
+        return False
+    finally:
+        _remove_quiet(list_path)
+
+
+# codec name, WxH, fps out of ffmpeg's "Stream #0:0 ... Video: ..." banner line
+_STREAM_VIDEO_RE = re.compile(r"Video: (\w+).*?(\d{2,5}x\d{2,5}).*?([\d.]+) (?:fps|tbr)")
+_STREAM_AUDIO_RE = re.compile(r"Stream #.*Audio:")
+_DURATION_RE = re.compile(r"Duration: (\d+):(\d+):(\d+\.?\d*)")
+
+
+def _probe_video_params(path: str) -> Optional[Tuple[str, str, str]]:
+    """Return (codec, resolution, fps) for a file's first video stream.
+
+    imageio_ffmpeg ships no ffprobe, so this parses the banner ffmpeg prints
+    for `-i` (the exit code is nonzero without an output — expected)."""
+    try:
+        from imageio_ffmpeg import get_ffmpeg_exe
+        proc = subprocess.run(
+            [get_ffmpeg_exe(), "-hide_banner", "-i", path],
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+        m = _STREAM_VIDEO_RE.search(proc.stderr or "")
+        return (m.group(1), m.group(2), m.group(3)) if m else None
     except Exception:
-        # moviepy/ffmpeg not available; return None so caller can surface error
         return None
 
-    temp_dir = tempfile.mkdtemp(prefix="video_stitch_")
-    local_paths: List[str] = []
+
+def _probe_banner(path: str) -> str:
+    """Raw stderr banner from `ffmpeg -i <path>` (nonzero exit expected)."""
     try:
-        # Download segments
-        for idx, url in enumerate(video_urls):
-            local_path = os.path.join(temp_dir, f"segment_{idx}.mp4")
-            with requests.get(url, stream=True, timeout=120) as r:
-                r.raise_for_status()
-                with open(local_path, "wb") as f:
-                    for chunk in r.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-            local_paths.append(local_path)
+        from imageio_ffmpeg import get_ffmpeg_exe
+        proc = subprocess.run(
+            [get_ffmpeg_exe(), "-hide_banner", "-i", path],
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+        return proc.stderr or ""
+    except Exception:
+        return ""
+
 
-        # Load and concatenate with gentle crossfade for continuity
-        clips = [VideoFileClip(p) for p in local_paths]
-        if len(clips) >= 2:
+def _seamless_ffmpeg(local_paths: List[str], output_path: str) -> bool:
+    """Seamless concat in a single ffmpeg process: hard video cuts plus
+    150ms afade in/out at each boundary — the same result as the moviepy
+    seamless path, but the filter graph runs in C and one process replaces
+    the decoder-per-clip pipeline moviepy builds. Requires every segment to
+    carry an audio stream (concat a=1 rejects silent inputs); returns False
+    so the caller can fall back to moviepy when that doesn't hold or ffmpeg
+    fails. Mirrors the filter_complex approach stitch_timelapse_clips uses."""
+    try:
+        from imageio_ffmpeg import get_ffmpeg_exe
+        ffmpeg_bin = get_ffmpeg_exe()
+    except Exception:
+        return False
+
+    audio_fade = 0.15
+    durations: List[float] = []
+    for p in local_paths:
+        banner = _probe_banner(p)
+        m = _DURATION_RE.search(banner)
+        if not m or not _STREAM_AUDIO_RE.search(banner):
+            return False
+        durations.append(int(m.group(1)) * 3600 + int(m.group(2)) * 60 + float(m.group(3)))
+
+    n = len(local_paths)
+    filter_parts = []
+    for i, dur in enumerate(durations):
+        fades = [f"afade=t=in:st=0:d={audio_fade}"]
+        out_start = max(0.0, dur - audio_fade)
+        fades.append(f"afade=t=out:st={out_start:.3f}:d={audio_fade}")
+        filter_parts.append(f"[{i}:a]{','.join(fades)}[a{i}]")
+    concat_inputs = "".join(f"[{i}:v][a{i}]" for i in range(n))
+    filter_parts.append(f"{concat_inputs}concat=n={n}:v=1:a=1[v][a]")
+
+    cmd: List[str] = [ffmpeg_bin, "-y"]
+    for p in local_paths:
+        cmd.extend(["-i", p])
+    cmd.extend(["-filter_complex", ";".join(filter_parts), "-map", "[v]", "-map", "[a]"])
+    if _nvenc_available():
+        cmd.extend(["-c:v", "h264_nvenc", "-preset", "p4", "-rc", "vbr", "-cq", "23"])
+    else:
+        cmd.extend(["-c:v", "libx264", "-preset", "veryfast", "-crf", "23"])
+    cmd.extend(["-c:a", "aac", "-r", "30", "-pix_fmt", "yuv420p", output_path])
+
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+    if proc.returncode != 0:
+        tail = proc.stderr.decode("utf-8", errors="replace").strip().splitlines()[-5:]
+        logger.info("Stitch: seamless ffmpeg path failed, falling back to moviepy: %s", " | ".join(tail))
+        return False
+    return os.path.exists(output_path) and os.path.getsize(output_path) > 0
+
+
+def _segments_compatible(sources: List[str]) -> bool:
+    """True when every segment shares codec/resolution/fps, i.e. the concat
+    demuxer can stream-copy them losslessly. Mismatched segments would still
+    mux with -c copy but play back corrupted, so probe before trusting it.
+    Sources may be local paths or http(s) URLs — ffmpeg probes both."""
+    params = {_probe_video_params(p) for p in sources}
+    return len(params) == 1 and None not in params
+
+
+def _moviepy_concat(local_paths: List[str], output_path: str, transition: str) -> Optional[str]:
+    """Shared moviepy decode-and-re-encode concat used by the stitchers when
+    the stream-copy fast path can't apply.
+
+    transition: "crossfade" = gentle 0.5s video+audio fades between segments;
+    "seamless" = hard cuts with 150ms audio-only fades to kill clicks.
+    Returns None on success or an error string when moviepy is unavailable.
+    Keeping this in one function means encoder/transition changes land in
+    exactly one place instead of drifting across three near-copies."""
+    mp = _moviepy()
+    if isinstance(mp, Exception):
+        return f"moviepy/ffmpeg unavailable: {mp}"
+    VideoFileClip, concatenate_videoclips = mp
+
+    # Probe the API surface once instead of wrapping every per-clip call in
+    # try/except — raised exceptions are expensive and the verdict can't
+    # change between clips.
+    has_crossfade = hasattr(VideoFileClip, "crossfadein")
+    has_afade = hasattr(VideoFileClip, "audio_fadein")
+
+    clips = [VideoFileClip(p) for p in local_paths]
+    # compose composites every frame onto a canvas (per-pixel work); chain
+    # just sequences the streams. chain is safe when all clips share
+    # resolution and fps — the common case for segments from one model.
+    # The crossfade overlap (negative padding) still needs compose.
+    try:
+        same_params = (
+            len({tuple(c.size) for c in clips}) == 1
+            and len({c.fps for c in clips}) == 1
+        )
+    except Exception:
+        same_params = False
+    plain_method = "chain" if same_params else "compose"
+    final = None
+    try:
+        if transition == "crossfade" and len(clips) >= 2:
             try:
                 fade = 0.5
                 mod: List = []
                 for i, c in enumerate(clips):
                     d = max(0.1, min(fade, (c.duration or 0.6) * 0.25))
                     if i > 0:
-                        try:
+                        if has_crossfade:
                             c = c.crossfadein(d)
-                        except Exception:
-                            pass
-                        try:
+                        if has_afade and c.audio is not None:
                             c = c.audio_fadein(d)
-                        except Exception:
-                            pass
-                    if i < len(clips) - 1:
-                        try:
-                            c = c.audio_fadeout(d)
-                        except Exception:
-                            pass
+                    if i < len(clips) - 1 and has_afade and c.audio is not None:
+                        c = c.audio_fadeout(d)
                     mod.append(c)
                 final = concatenate_videoclips(mod, method="compose", padding=-d)
             except Exception:
-                final = concatenate_videoclips(clips, method="compose")
+                final = concatenate_videoclips(clips, method=plain_method)
+        elif transition == "seamless" and len(clips) >= 2:
+            # ONLY subtle audio fades at boundaries (no visual crossfade) -
+            # prevents audio pops/clicks without any visible transition
+            mod = []
+            audio_fade = 0.15  # just enough to prevent clicks
+            for i, c in enumerate(clips):
+                if has_afade and c.audio is not None:
+                    try:
+                        if i > 0:
+                            c = c.audio_fadein(audio_fade)
+                        if i < len(clips) - 1:
+                            c = c.audio_fadeout(audio_fade)
+                    except Exception:
+                        pass
+                mod.append(c)
+            final = concatenate_videoclips(mod, method=plain_method)
         else:
-            final = concatenate_videoclips(clips, method="compose")
-        output_path = os.path.join(temp_dir, "stitched.mp4")
-        final.write_videofile(output_path, codec="libx264", audio_codec="aac")
-
+            final = concatenate_videoclips(clips, method=plain_method)
+
+        if transition == "seamless":
+            if _nvenc_available():
+                # Offload the re-encode to the GPU; p4 ~ libx264 "fast" quality
+                final.write_videofile(
+                    output_path,
+                    codec="h264_nvenc",
+                    audio_codec="aac",
+                    fps=30,  # Consistent framerate
+                    logger=None,
+                    ffmpeg_params=["-preset", "p4", "-rc", "vbr", "-cq", "23", "-pix_fmt", "yuv420p", "-movflags", "+faststart"],
+                )
+            else:
+                final.write_videofile(
+                    output_path,
+                    codec="libx264",
+                    audio_codec="aac",
+                    fps=30,  # Consistent framerate
+                    # veryfast is the knee of the preset curve: similar wall time
+                    # to ultrafast but ~half the file size, which downstream
+                    # uploads/downloads pay for. CRF keeps rate control
+                    # quality-based instead of a fixed 4000k bitrate.
+                    preset="veryfast",
+                    threads=os.cpu_count(),
+                    logger=None,
+                    # yuv420p pinned explicitly: moviepy hands the encoder RGB
+                    # frames, and without the pin some builds emit yuv444p,
+                    # which QuickTime/mobile players refuse to decode.
+                    ffmpeg_params=["-crf", "23", "-pix_fmt", "yuv420p", "-movflags", "+faststart"],
+                )
+        else:
+            final.write_videofile(
+                output_path,
+                codec="libx264",
+                audio_codec="aac",
+                threads=os.cpu_count(),
+                logger=None,
+                ffmpeg_params=["-pix_fmt", "yuv420p", "-movflags", "+faststart"],
+            )
+        return None
+    finally:
         # Close clips to release file handles on Windows
-        try:
-            final.close()
-        except Exception:
-            pass
+        if final is not None:
+            try:
+                final.close()
+            except Exception:
+                pass
         for c in clips:
             try:
                 c.close()
             except Exception:
                 pass
 
-        # Move stitched file to project root for convenience
-        destination = os.path.abspath("stitched_output.mp4")
-        try:
-            if os.path.exists(destination):
-                os.remove(destination)
-        except Exception:
-            pass
-        shutil.move(output_path, destination)
+
+def _unique_stitched_path() -> str:
+    """Return a unique path like clips/stitched/stitched-{timestamp}.mp4"""
+    stitched_dir = os.path.join(os.path.abspath(os.getcwd()), "clips", "stitched")
+    os.makedirs(stitched_dir, exist_ok=True)
+    filename = f"stitched-{int(time.time())}.mp4"
+    return os.path.join(stitched_dir, filename)
+
+
+def stitch_videos(video_urls: List[str]) -> Optional[str]:
+    """
+    Stitch remote video URLs into a single local file using moviepy if available.
+    Falls back to returning the first URL if stitching is unavailable or fails.
+    """
+    if not video_urls:
+        return None
+    if len(video_urls) == 1:
+        # Nothing to stitch — hand the lone source straight back instead of
+        # downloading and re-encoding it into an identical file.
+        return video_urls[0]
+
+    temp_dir = _scratch_dir("video_stitch_")
+    local_paths: List[str] = []
+    # Encode/mux straight into the destination directory: the temp dir often
+    # sits on a different filesystem (Docker overlayfs), where the final
+    # shutil.move degrades to a full byte copy. The .part.mp4 name keeps the
+    # mp4 muxer inference working and os.replace publishes atomically.
+    destination = os.path.abspath("stitched_output.mp4")
+    output_path = destination + ".part.mp4"
+    try:
+        # Fastest path: when every source is remote, let ffmpeg fetch and
+        # stream-copy directly from the CDN — segments never touch local
+        # disk. Probe the URLs first, same as the local path below: the
+        # concat demuxer muxes mismatched segments with exit code 0 and the
+        # result plays back corrupted. Gate the fallbacks on the returned
+        # boolean, not the file's existence — a mid-transfer drop leaves a
+        # truncated partial behind.
+        stitched = False
+        if all(u.startswith("http") for u in video_urls):
+            stitched = _segments_compatible(video_urls) and _concat_stream_copy(video_urls, output_path)
+
+        if not stitched:
+            # Download segments (concurrent, order-preserving)
+            local_paths.extend(_download_segments(video_urls, temp_dir))
+
+            # Local fast path: segments from the same model/resolution share
+            # a codec, so the concat demuxer stream-copies without touching a
+            # single frame. Trades the 0.5s crossfade for a hard cut. Probe
+            # first — mismatched segments would mux but play back corrupted.
+            stitched = _segments_compatible(local_paths) and _concat_stream_copy(local_paths, output_path)
+
+        if not stitched:
+            if _moviepy_concat(local_paths, output_path, "crossfade") is not None:
+                # moviepy/ffmpeg not available; return None so caller can surface error
+                return None
+
+        # Publish atomically within the destination filesystem
+        os.replace(output_path, destination)
         return destination
     except Exception:
         return None
     finally:
-        # Cleanup temp files
-        for p in local_paths:
-            try:
-                if os.path.exists(p):
-                    os.remove(p)
-            except Exception:
-                pass
+        # Cleanup temp files (and any orphaned partial output)
+        try:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+        except Exception:
+            pass
+        # local_paths all live inside temp_dir; rmtree covers them.
         try:
             shutil.rmtree(temp_dir, ignore_errors=True)
         except Exception:
@@ -124,72 +483,28 @@ def stitch_videos_detailed(video_urls: List[str]) -> Dict[str, Any]:
         result["error"] = "No video URLs provided"
         return result
 
-    try:
-        from moviepy import VideoFileClip, concatenate_videoclips
-    except Exception as e:
-        result["error"] = f"moviepy/ffmpeg unavailable: {e}"
-        return result
-
-    temp_dir = tempfile.mkdtemp(prefix="video_stitch_")
+    temp_dir = _scratch_dir("video_stitch_")
     local_paths: List[str] = []
+    # Write into the destination directory to avoid a cross-filesystem move
+    # of the finished file; os.replace publishes it atomically.
+    destination = _unique_stitched_path()
+    output_path = destination + ".part.mp4"
     try:
-        # Download segments
-        for idx, url in enumerate(video_urls):
-            local_path = os.path.join(temp_dir, f"segment_{idx}.mp4")
-            with requests.get(url, stream=True, timeout=120) as r:
-                r.raise_for_status()
-                with open(local_path, "wb") as f:
-                    for chunk in r.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-            local_paths.append(local_path)
+        # Download segments (concurrent, order-preserving)
+        local_paths.extend(_download_segments(video_urls, temp_dir))
 
         result["segments"] = list(local_paths)
 
-        # Load and concatenate with gentle crossfade for continuity
-        clips = [VideoFileClip(p) for p in local_paths]
-        if len(clips) >= 2:
-            try:
-                fade = 0.5
-                mod: List = []
-                for i, c in enumerate(clips):
-                    d = max(0.1, min(fade, (c.duration or 0.6) * 0.25))
-                    if i > 0:
-                        try:
-                            c = c.crossfadein(d)
-                        except Exception:
-                            pass
-                        try:
-                            c = c.audio_fadein(d)
-                        except Exception:
-                            pass
-                    if i < len(clips) - 1:
-                        try:
-                            c = c.audio_fadeout(d)
-                        except Exception:
-                            pass
-                    mod.append(c)
-                final = concatenate_videoclips(mod, method="compose", padding=-d)
-            except Exception:
-                final = concatenate_videoclips(clips, method="compose")
-        else:
-            final = concatenate_videoclips(clips, method="compose")
-        output_path = os.path.join(temp_dir, "stitched.mp4")
-        final.write_videofile(output_path, codec="libx264", audio_codec="aac")
-
-        # Close
-        try:
-            final.close()
-        except Exception:
-            pass
-        for c in clips:
-            try:
-                c.close()
-            except Exception:
-                pass
+        # Fast path first: same-codec segments stream-copy via the concat
+        # demuxer (no decode/re-encode). Probe first — mismatched segments
+        # would mux but play back corrupted. Falls back to moviepy+crossfade.
+        if not (_segments_compatible(local_paths) and _concat_stream_copy(local_paths, output_path)):
+            err = _moviepy_concat(local_paths, output_path, "crossfade")
+            if err is not None:
+                result["error"] = err
+                return result
 
-        destination = _unique_stitched_path()
-        shutil.move(output_path, destination)
+        os.replace(output_path, destination)
         result["success"] = True
         result["output_path"] = destination
         result["filename"] = os.path.basename(destination)
@@ -198,13 +513,13 @@ def stitch_videos_detailed(video_urls: List[str]) -> Dict[str, Any]:
         result["error"] = str(e)
         return result
     finally:
-        # Cleanup temp files
-        for p in local_paths:
-            try:
-                if os.path.exists(p):
-                    os.remove(p)
-            except Exception:
-                pass
+        # Cleanup temp files (and any orphaned partial output)
+        try:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+        except Exception:
+            pass
+        # local_paths all live inside temp_dir; rmtree covers them.
         try:
             shutil.rmtree(temp_dir, ignore_errors=True)
         except Exception:
@@ -227,79 +542,28 @@ def stitch_videos_seamless(video_urls: List[str]) -> Dict[str, Any]:
         result["error"] = "No video URLs provided"
         return result
 
-    try:
-        from moviepy import VideoFileClip, concatenate_videoclips
-    except Exception as e:
-        result["error"] = f"moviepy/ffmpeg unavailable: {e}"
-        return result
-
-    temp_dir = tempfile.mkdtemp(prefix="video_seamless_")
+    temp_dir = _scratch_dir("video_seamless_")
     local_paths: List[str] = []
-    clips = []
+    # Encode into the destination directory (see stitch_videos_detailed):
+    # avoids a cross-filesystem move of the finished file.
+    destination = _unique_stitched_path()
+    output_path = destination + ".part.mp4"
 
     try:
-        # Download segments
-        for idx, url in enumerate(video_urls):
-            local_path = os.path.join(temp_dir, f"segment_{idx}.mp4")
-            with requests.get(url, stream=True, timeout=120) as r:
-                r.raise_for_status()
-                with open(local_path, "wb") as f:
-                    for chunk in r.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-            local_paths.append(local_path)
+        # Download segments (concurrent, order-preserving)
+        local_paths.extend(_download_segments(video_urls, temp_dir))
 
         result["segments"] = list(local_paths)
 
-        # Load clips
-        clips = [VideoFileClip(p) for p in local_paths]
-
-        # Apply ONLY subtle audio fades at boundaries (no visual crossfade)
-        # This prevents audio pops/clicks without any visible transition
-        if len(clips) >= 2:
-            mod: List = []
-            audio_fade = 0.15  # Very short audio fade (150ms) - just enough to prevent clicks
-            for i, c in enumerate(clips):
-                # Only apply audio fades, NO visual effects
-                if c.audio is not None:
-                    try:
-                        if i > 0:
-                            # Fade in audio at the start of clips after the first
-                            c = c.audio_fadein(audio_fade)
-                        if i < len(clips) - 1:
-                            # Fade out audio at the end of clips before the last
-                            c = c.audio_fadeout(audio_fade)
-                    except Exception:
-                        pass
-                mod.append(c)
-            # Concatenate with NO padding (hard cut) - the clips should flow seamlessly
-            final = concatenate_videoclips(mod, method="compose")
-        else:
-            final = concatenate_videoclips(clips, method="compose")
-
-        output_path = os.path.join(temp_dir, "stitched.mp4")
-        final.write_videofile(
-            output_path,
-            codec="libx264",
-            audio_codec="aac",
-            fps=30,  # Consistent framerate
-            preset="ultrafast",  # Fast encoding for Replit/cloud
-            bitrate="4000k",  # Good quality, faster encoding
-        )
-
-        # Close handles
-        try:
-            final.close()
-        except Exception:
-            pass
-        for c in clips:
-            try:
-                c.close()
-            except Exception:
-                pass
+        # Single ffmpeg process (afade + concat filter) when every segment
+        # has audio; moviepy's per-clip decoder pipeline is the fallback.
+        if len(local_paths) < 2 or not _seamless_ffmpeg(local_paths, output_path):
+            err = _moviepy_concat(local_paths, output_path, "seamless")
+            if err is not None:
+                result["error"] = err
+                return result
 
-        destination = _unique_stitched_path()
-        shutil.move(output_path, destination)
+        os.replace(output_path, destination)
 
         result["success"] = True
         result["output_path"] = destination
@@ -311,19 +575,13 @@ def stitch_videos_seamless(video_urls: List[str]) -> Dict[str, Any]:
         return result
 
     finally:
-        # Close any remaining clips
-        for c in clips:
-            try:
-                c.close()
-            except Exception:
-                pass
-        # Cleanup temp files (stitch_videos_seamless)
-        for p in local_paths:
-            try:
-                if os.path.exists(p):
-                    os.remove(p)
-            except Exception:
-                pass
+        # Cleanup temp files (stitch_videos_seamless) and any partial output
+        try:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+        except Exception:
+            pass
+        # local_paths all live inside temp_dir; rmtree covers them.
         try:
             shutil.rmtree(temp_dir, ignore_errors=True)
         except Exception:
@@ -370,27 +628,14 @@ def stitch_timelapse_clips(
         result["error"] = f"ffmpeg unavailable: {e}"
         return result
 
-    temp_dir = tempfile.mkdtemp(prefix="timelapse_stitch_")
+    temp_dir = _scratch_dir("timelapse_stitch_")
     local_paths: List[str] = []
 
     try:
-        # Download (or copy) each source to temp_dir. Sequential writes are
-        # cheap on every filesystem including NBD-backed /tmp.
-        for idx, src in enumerate(video_sources):
-            local_path = os.path.join(temp_dir, f"segment_{idx}.mp4")
-            if src.startswith("http"):
-                with requests.get(src, stream=True, timeout=120) as r:
-                    r.raise_for_status()
-                    with open(local_path, "wb") as f:
-                        for chunk in r.iter_content(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
-            elif os.path.isfile(src):
-                shutil.copy2(src, local_path)
-            else:
-                result["error"] = f"Invalid video source: {src}"
-                return result
-            local_paths.append(local_path)
+        # Download (or copy) each source to temp_dir, concurrently for URLs.
+        # Sequential writes are cheap on every filesystem including
+        # NBD-backed /tmp.
+        local_paths.extend(_download_segments(video_sources, temp_dir))
 
         result["segments"] = list(local_paths)
 
@@ -415,7 +660,10 @@ def stitch_timelapse_clips(
         filter_parts.append(f"{concat_inputs}concat=n={n}:v=1:a=0[outv]")
         filter_complex = ";".join(filter_parts)
 
-        output_path = os.path.join(temp_dir, "timelapse.mp4")
+        # Encode into the destination directory (see stitch_videos_detailed):
+        # avoids a cross-filesystem move of the finished file.
+        destination = _unique_stitched_path()
+        output_path = destination + ".part.mp4"
         cmd: List[str] = [ffmpeg_bin, "-y"]
         for p in local_paths:
             cmd.extend(["-i", p])
@@ -447,8 +695,7 @@ def stitch_timelapse_clips(
             result["error"] = "ffmpeg failed:\n" + "\n".join(tail)
             return result
 
-        destination = _unique_stitched_path()
-        shutil.move(output_path, destination)
+        os.replace(output_path, destination)
 
         logger.info("Stitch: ffmpeg completed in %.1fs -> %s", ffmpeg_elapsed, os.path.basename(destination))
         result["success"] = True
@@ -461,12 +708,12 @@ def stitch_timelapse_clips(
         return result
 
     finally:
-        for p in local_paths:
-            try:
-                if os.path.exists(p):
-                    os.remove(p)
-            except Exception:
-                pass
+        try:
+            if "output_path" in locals() and os.path.exists(output_path):
+                os.remove(output_path)
+        except Exception:
+            pass
+        # local_paths all live inside temp_dir; rmtree covers them.
         try:
             shutil.rmtree(temp_dir, ignore_errors=True)
         except Exception:
@@ -486,12 +733,12 @@ def extract_first_frame(
     temp_dir: Optional[str] = None
     try:
         if is_url:
-            temp_dir = tempfile.mkdtemp(prefix="extract_frame_")
+            temp_dir = _scratch_dir("extract_frame_")
             source = os.path.join(temp_dir, "source")
-            with requests.get(video_path_or_url, stream=True, timeout=120) as r:
+            with _DL_SESSION.get(video_path_or_url, stream=True, timeout=120) as r:
                 r.raise_for_status()
                 with open(source, "wb") as f:
-                    for chunk in r.iter_content(chunk_size=8192):
+                    for chunk in r.iter_content(chunk_size=_DOWNLOAD_CHUNK_SIZE):
                         if chunk:
                             f.write(chunk)
         else:
@@ -0,0 +1,89 @@
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Optional
+
+"""On-disk cache for generated video results.
+
+Generation is the dominant latency and cost in the UI; re-submitting an
+identical prompt (or the same audio file) re-hits the provider for the
+same clip. Successful results are stored as small JSON envelopes keyed
+by a SHA-256 of the request parameters, so repeats return in
+milliseconds.
+
+Provider download URLs expire, so entries honor a max age (default 7
+days, override via S2V_VIDEO_CACHE_TTL_SECONDS). Set S2V_NO_VIDEO_CACHE=1
+to bypass the cache entirely.
+"""
+
+_DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+
+def enabled() -> bool:
+    return os.getenv("S2V_NO_VIDEO_CACHE", "0").lower() not in {"1", "true", "yes", "on"}
+
+
+def _cache_dir() -> str:
+    d = os.getenv("S2V_VIDEO_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "s2v", "video"
+    )
+    os.makedirs(d, exist_ok=True)
+    return d
+
+
+def prompt_key(prompt: str, duration: int) -> str:
+    payload = json.dumps({"prompt": prompt, "duration": duration}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def audio_key(audio_path: str, duration: int) -> str:
+    with open(audio_path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):
+            # 3.11+: C-level read loop straight into OpenSSL's SHA-256
+            # (hardware-accelerated where available) — no Python-side
+            # chunk shuffling.
+            h = hashlib.file_digest(f, "sha256")
+        else:
+            h = hashlib.sha256()
+            for chunk in iter(lambda: f.read(65536), b""):
+                h.update(chunk)
+    h.update(f"|duration={duration}".encode("utf-8"))
+    return h.hexdigest()
+
+
+def get(key: str) -> Optional[Dict]:
+    if not enabled():
+        return None
+    path = os.path.join(_cache_dir(), f"{key}.json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            envelope = json.load(f)
+    except Exception:
+        return None
+    ttl = int(os.getenv("S2V_VIDEO_CACHE_TTL_SECONDS", str(_DEFAULT_TTL_SECONDS)))
+    if time.time() - envelope.get("ts", 0) > ttl:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+    return envelope.get("result")
+
+
+def put(key: str, result: Dict) -> None:
+    # Only cache completed generations with a playable URL; errors and
+    # partial results must stay retryable.
+    if not enabled() or not result.get("video_url"):
+        return
+    path = os.path.join(_cache_dir(), f"{key}.json")
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"ts": time.time(), "result": result}, f)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
@@ -1,5 +1,8 @@
+import asyncio
+import functools
 import json
 import os
+import threading
 import time
 import traceback
 from typing import Optional
@@ -7,14 +10,30 @@ from collections import defaultdict, deque
 
 import gradio as gr
 
+try:
+    # Same optional speedup the API layer gets from ORJSONResponse
+    import orjson
+except Exception:
+    orjson = None
+
 from ..services.video_service import VideoService
 from ..utils.config import get_settings
 from ..utils.video import stitch_videos, stitch_videos_detailed
 from ..utils.clip_store import add_clip, list_clips, clear_clips
+from ..utils import video_cache
+
+
+@functools.lru_cache(maxsize=1)
+def _settings():
+    return get_settings()
 
 
-settings = get_settings()
-system = VideoService()
+@functools.lru_cache(maxsize=1)
+def _system() -> VideoService:
+    # Deferred: VideoService builds three API clients; constructing it at
+    # import made every reload/test import pay that cost up front.
+    return VideoService()
+
 
 # Basic hardening and limits
 _WINDOW = int(os.getenv("RATE_WINDOW_SECONDS", "60"))
@@ -25,6 +44,43 @@ MAX_PROMPT_CHARS = int(os.getenv("MAX_PROMPT_CHARS", "500"))
 PUBLIC_MODE = os.getenv("PUBLIC_MODE", "0").lower() in {"1", "true", "yes", "on"}
 MAINT_MODE = os.getenv("MAINTENANCE_MODE", "0").lower() in {"1", "true", "yes", "on"}
 
+def _dumps(obj, pretty: bool = True) -> str:
+    # Every handler in this module ends in a JSON dump; orjson's C encoder
+    # keeps that off the event loop's Python hot path.
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0).decode()
+    if pretty:
+        return json.dumps(obj, indent=2)
+    return json.dumps(obj, separators=(",", ":"))
+
+
+# Error-envelope hints: the base list plus keyword-triggered extras.
+# Built once at import so the exception path just scans the message and
+# extends — no per-exception list literals or repeated branches.
+_BASE_HINTS = (
+    "Verify OPENAI_API_KEY and AIMLAPI_API_KEY are set in .env",
+    "Ensure internet connectivity",
+    "If stitching is enabled, verify ffmpeg is installed (moviepy)",
+)
+_HINT_RULES = (
+    (
+        ("insufficient_quota", "error code: 429", "rate limit"),
+        (
+            "OpenAI quota exceeded: add billing/credits or wait/reset",
+            "Enter a Prompt in the UI to bypass transcription (uses AIMLAPI only)",
+            "Or use CLI: python -m src.speech_to_video.cli generate --prompt '...' --duration 10",
+        ),
+    ),
+    (
+        ("503", "service unavailable", "unexpected error occurred"),
+        (
+            "AIMLAPI returned 503: temporary service issue",
+            "Please try again in a minute",
+        ),
+    ),
+)
+
+
 def _client_ip(request: gr.Request) -> str:
     try:
         return request.client.host or "unknown"
@@ -43,66 +99,138 @@ def _rate_limit(request: gr.Request):
     dq.append(now)
 
 
-def run_speech_to_video(audio_path: str, prompt: str, request: gr.Request):
+# Single-flight map: concurrent identical generations (same cache key)
+# coalesce into one provider call — the first request creates the task,
+# later arrivals await the same one instead of paying for a duplicate clip.
+_inflight: dict = {}
+
+
+async def _generate_once(cache_key: str, fn, **kwargs):
+    task = _inflight.get(cache_key)
+    if task is None:
+        task = asyncio.create_task(asyncio.to_thread(fn, **kwargs))
+        _inflight[cache_key] = task
+        task.add_done_callback(lambda _t: _inflight.pop(cache_key, None))
+    return await task
+
+
+async def run_speech_to_video(audio_path: str, prompt: str, request: gr.Request):
+    # Async generator: each yield streams a status update to the UI, so the
+    # user sees transcribing/generating milestones instead of a frozen screen,
+    # and the blocking provider calls run via asyncio.to_thread so the event
+    # loop keeps serving cheap events (setup checks, clip list) meanwhile.
     try:
         _rate_limit(request)
         if MAINT_MODE:
-            return None, json.dumps({"success": False, "error": "Maintenance mode"}, indent=2), None
+            yield None, _dumps({"success": False, "error": "Maintenance mode"}), None
+            return
         manual_prompt = (prompt or "").strip()
         if manual_prompt and len(manual_prompt) > MAX_PROMPT_CHARS:
-            return None, json.dumps({"success": False, "error": "Prompt too long"}, indent=2), None
+            yield None, _dumps({"success": False, "error": "Prompt too long"}), None
+            return
         if manual_prompt:
-            # Use a single-clip call; many providers ignore duration, but 10s keeps us on single path
-            result = system.generate_video(prompt=manual_prompt, duration=10)
+            # Repeat prompts are served from the on-disk result cache —
+            # generation is the dominant latency and cost here.
+            cache_key = video_cache.prompt_key(manual_prompt, 10)
+            result = video_cache.get(cache_key)
+            if result is None:
+                yield None, _dumps({"status": "generating"}), None
+                # Use a single-clip call; many providers ignore duration, but 10s keeps us on single path
+                result = await _generate_once(cache_key, _system().generate_video, prompt=manual_prompt, duration=10)
+                video_cache.put(cache_key, result)
             result.setdefault("prompt_used", manual_prompt)
         else:
             if not audio_path:
-                return None, json.dumps({"success": False, "error": "No audio provided or prompt supplied"}, indent=2), None
+                yield None, _dumps({"success": False, "error": "No audio provided or prompt supplied"}), None
+                return
             try:
                 if os.path.exists(audio_path) and os.path.getsize(audio_path) > MAX_AUDIO_BYTES:
-                    return None, json.dumps({"success": False, "error": "Audio too large"}, indent=2), None
+                    yield None, _dumps({"success": False, "error": "Audio too large"}), None
+                    return
             except Exception:
                 pass
-            result = system.speech_to_video_with_audio(audio_path=audio_path, duration=10)
+            # Same audio bytes -> same clip; key on the file content hash.
+            cache_key = video_cache.audio_key(audio_path, 10)
+            result = video_cache.get(cache_key)
+            if result is None:
+                # Transcribe and generate as separate steps (rather than the
+                # bundled speech_to_video_with_audio) so the yields line up
+                # with real milestones.
+                yield None, _dumps({"status": "transcribing"}), None
+                transcript = await asyncio.to_thread(_system().openai_client.transcribe, audio_path)
+                text = transcript.get("text", "")
+                if _settings().debug_transcript:
+                    print("[DEBUG] Transcript:", text)
+                yield None, _dumps({"status": "generating", "transcript": text}), None
+                result = await _generate_once(cache_key, _system().generate_video, prompt=text, duration=10)
+                result["transcript"] = text
+                video_cache.put(cache_key, result)
         video = result.get("video_url")
-        return video, json.dumps(result, indent=2), video
+        yield video, _dumps(result), video
     except Exception as exc:
         err = {
             "success": False,
             "error": str(exc),
             "traceback": traceback.format_exc(),
-            "hints": [
-                "Verify OPENAI_API_KEY and AIMLAPI_API_KEY are set in .env",
-                "Ensure internet connectivity",
-                "If stitching is enabled, verify ffmpeg is installed (moviepy)",
-            ],
+            "hints": list(_BASE_HINTS),
         }
         msg = str(exc).lower()
-        if "insufficient_quota" in msg or "error code: 429" in msg or "rate limit" in msg:
-            err.setdefault("hints", []).extend([
-                "OpenAI quota exceeded: add billing/credits or wait/reset",
-                "Enter a Prompt in the UI to bypass transcription (uses AIMLAPI only)",
-                "Or use CLI: python -m src.speech_to_video.cli generate --prompt '...' --duration 10",
-            ])
-        if "503" in msg or "service unavailable" in msg or "unexpected error occurred" in msg:
-            err.setdefault("hints", []).extend([
-                "AIMLAPI returned 503: temporary service issue",
-                "Please try again in a minute",
-            ])
-        return None, json.dumps(err, indent=2), None
+        for keywords, extra_hints in _HINT_RULES:
+            if any(k in msg for k in keywords):
+                err["hints"].extend(extra_hints)
+        # Compact separators: the error envelope carries a full traceback,
+        # no point pretty-printing a multi-KB string over the websocket.
+        yield None, _dumps(err, pretty=False), None
+
+
+def _ttl_cache(seconds: float):
+    """Memoize a zero-arg function for `seconds`; exposes cache_clear().
+
+    lru_cache never expires, which is wrong for checks that should notice a
+    fixed key or restored connectivity within a page session."""
+    def deco(fn):
+        state = {"value": None, "expires": 0.0}
+
+        @functools.wraps(fn)
+        def wrapper():
+            now = time.time()
+            if now < state["expires"]:
+                return state["value"]
+            state["value"] = fn()
+            state["expires"] = now + seconds
+            return state["value"]
+
+        def cache_clear():
+            state["expires"] = 0.0
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return deco
+
+
+@functools.lru_cache(maxsize=1)
+def _setup_static():
+    # The non-boolean half of the setup payload is fixed for the process
+    # lifetime (settings is an immutable snapshot) — build it once.
+    s = _settings()
+    return {
+        "aimlapi_base_url": s.aimlapi_base_url,
+        "aimlapi_generate_path": s.aimlapi_generate_path,
+        "aimlapi_status_path": s.aimlapi_status_path,
+        "openai_chat_model": s.openai_chat_model,
+        "openai_transcribe_model": s.openai_transcribe_model,
+    }
 
 
+@_ttl_cache(60)
 def check_setup():
+    s = _settings()
     info = {
-        "openai_api_key_present": bool(settings.openai_api_key),
-        "openai_org_id_present": bool(getattr(settings, "openai_org_id", "")),
-        "openai_project_present": bool(getattr(settings, "openai_project", "")),
-        "aimlapi_api_key_present": bool(settings.aimlapi_api_key),
-        "aimlapi_base_url": settings.aimlapi_base_url,
-        "aimlapi_generate_path": settings.aimlapi_generate_path,
-        "aimlapi_status_path": settings.aimlapi_status_path,
-        "openai_chat_model": settings.openai_chat_model,
-        "openai_transcribe_model": settings.openai_transcribe_model,
+        "openai_api_key_present": bool(s.openai_api_key),
+        "openai_org_id_present": bool(getattr(s, "openai_org_id", "")),
+        "openai_project_present": bool(getattr(s, "openai_project", "")),
+        "aimlapi_api_key_present": bool(s.aimlapi_api_key),
+        **_setup_static(),
     }
     tips = []
     if not info["openai_api_key_present"]:
@@ -113,117 +241,238 @@ def check_setup():
         tips.append("Optionally set OPENAI_PROJECT for project-scoped keys (sk-proj-...)")
     if not info["aimlapi_api_key_present"]:
         tips.append("Set AIMLAPI_API_KEY in .env (then restart app)")
-    return json.dumps({"env": info, "tips": tips}, indent=2)
+    return _dumps({"env": info, "tips": tips})
 
 
-def test_openai_key():
-    try:
-        from openai import OpenAI
+@functools.lru_cache(maxsize=1)
+def _openai_client():
+    # Process-wide singleton: rebuilding the client per click re-initializes
+    # the httpx pool, so every test paid DNS + TLS handshake again.
+    from openai import OpenAI
 
-        client = OpenAI(
-            api_key=settings.openai_api_key,
-            organization=(getattr(settings, "openai_org_id", "") or None),
-            project=(getattr(settings, "openai_project", "") or None),
-        )
-        models = client.models.list()
+    return OpenAI(
+        api_key=_settings().openai_api_key,
+        organization=(getattr(_settings(), "openai_org_id", "") or None),
+        project=(getattr(_settings(), "openai_project", "") or None),
+    )
+
+
+@_ttl_cache(30)
+def _test_openai_key_blocking():
+    # The models.list() round-trip costs latency and API quota; repeated
+    # button mashing within 30s reuses the last verdict.
+    try:
+        models = _openai_client().models.list()
         count = len(getattr(models, "data", []) or [])
-        return json.dumps({"success": True, "models_count": count}, indent=2)
+        return _dumps({"success": True, "models_count": count})
     except Exception as exc:
-        return json.dumps({"success": False, "error": str(exc)}, indent=2)
+        return _dumps({"success": False, "error": str(exc)})
+
+
+async def test_openai_key():
+    return await asyncio.to_thread(_test_openai_key_blocking)
+
 
+# Serialized clip list, invalidated by a version counter the mutating
+# handlers bump. The clip store already skips re-parsing an unchanged
+# playlist; this skips re-running json.dumps on every button click too.
+_clips_version = 0
+_clips_json_state = {"version": -1, "value": "[]"}
 
-def test_aimlapi_paths():
+
+def _bump_clips_version():
+    global _clips_version
+    _clips_version += 1
+
+
+def _clips_json() -> str:
+    if _clips_json_state["version"] != _clips_version:
+        _clips_json_state["value"] = _dumps(list_clips())
+        _clips_json_state["version"] = _clips_version
+    return _clips_json_state["value"]
+
+
+def _refresh_setup():
+    # The env check is effectively constant: Settings field defaults are
+    # evaluated when config.py is imported, so a .env edit needs a restart
+    # (the tips say as much). Refresh just bypasses the TTL so a user gets
+    # a freshly computed verdict rather than a possibly 60s-old one.
+    check_setup.cache_clear()
+    return check_setup()
+
+
+async def test_aimlapi_paths():
     try:
-        client = system.aiml_client
+        client = _system().aiml_client
         # Probe generate with a dry-run-like tiny prompt and duration=1 (provider may ignore)
-        data = client.generate_video(prompt="ping", duration=1, quality="medium")
-        return json.dumps({"response": data}, indent=2)
+        data = await asyncio.to_thread(client.generate_video, prompt="ping", duration=1, quality="medium")
+        return _dumps({"response": data})
     except Exception as exc:
-        return json.dumps({"error": str(exc)}, indent=2)
+        return _dumps({"error": str(exc)})
+
 
+@functools.lru_cache(maxsize=1)
+def build_app() -> gr.Blocks:
+    """Construct the Blocks UI (once — lru_cache) and configure its queue.
 
-with gr.Blocks(title="Speech to Video (WAN 2.1 Turbo)") as app:
-    gr.Markdown("""
-    **Speech to Video (WAN 2.1 Turbo)**
+    Deferred behind a factory so importing this module (tests, the
+    optional /gradio mount in the API server) doesn't pay Gradio's
+    component construction and layout validation until the UI is
+    actually wanted."""
+    with gr.Blocks(title="Speech to Video (WAN 2.1 Turbo)") as app:
+        gr.Markdown("""
+        **Speech to Video (WAN 2.1 Turbo)**
     
-    1. Record or upload an audio clip, or provide a prompt.
-    2. Generate a video using WAN 2.1 Turbo.
-    """)
-
-    with gr.Accordion("Setup status", open=False):
-        setup_box = gr.Code(label="Environment checks", value=check_setup())
-        if not PUBLIC_MODE:
-            with gr.Row():
+        1. Record or upload an audio clip, or provide a prompt.
+        2. Generate a video using WAN 2.1 Turbo.
+        """)
+
+        with gr.Accordion("Setup status", open=False):
+            setup_box = gr.Code(label="Environment checks", value=check_setup())
+            if not PUBLIC_MODE:
+                with gr.Row():
+                    refresh = gr.Button("Refresh checks")
+                    test_key = gr.Button("Test OpenAI Key")
+                    test_aiml = gr.Button("Test AIMLAPI Paths")
+                test_out = gr.Code(label="OpenAI test result")
+                test_aiml_out = gr.Code(label="AIMLAPI test result")
+                refresh.click(fn=_refresh_setup, inputs=None, outputs=setup_box)
+                test_key.click(fn=test_openai_key, inputs=None, outputs=test_out)
+                test_aiml.click(fn=test_aimlapi_paths, inputs=None, outputs=test_aiml_out)
+            else:
                 refresh = gr.Button("Refresh checks")
-                test_key = gr.Button("Test OpenAI Key")
-                test_aiml = gr.Button("Test AIMLAPI Paths")
-            test_out = gr.Code(label="OpenAI test result")
-            test_aiml_out = gr.Code(label="AIMLAPI test result")
-            refresh.click(fn=check_setup, inputs=None, outputs=setup_box)
-            test_key.click(fn=test_openai_key, inputs=None, outputs=test_out)
-            test_aiml.click(fn=test_aimlapi_paths, inputs=None, outputs=test_aiml_out)
-        else:
-            refresh = gr.Button("Refresh checks")
-            refresh.click(fn=check_setup, inputs=None, outputs=setup_box)
-
-    with gr.Row():
-        audio = gr.Audio(sources=["microphone", "upload"], type="filepath", label="Speech audio")
-        with gr.Column():
-            prompt = gr.Textbox(label="Prompt (optional; bypasses transcription)")
-            submit = gr.Button("Generate Video")
-
-    with gr.Row():
-        video_out = gr.Video(label="Generated Video")
-        meta_out = gr.Code(label="Result JSON")
-
-    # track last clip url
-    last_clip_url = gr.State(None)
-    submit.click(fn=run_speech_to_video, inputs=[audio, prompt], outputs=[video_out, meta_out, last_clip_url])
-
-    def _save_last_clip(note: str, url):
-        if not url:
-            return json.dumps({"success": False, "error": "No last clip to save"}, indent=2), json.dumps(list_clips(), indent=2)
-        entry = add_clip(url, note)
-        return json.dumps({"success": True, "saved": entry}, indent=2), json.dumps(list_clips(), indent=2)
+                refresh.click(fn=_refresh_setup, inputs=None, outputs=setup_box)
+
+        with gr.Row():
+            audio = gr.Audio(sources=["microphone", "upload"], type="filepath", label="Speech audio")
+            with gr.Column():
+                prompt = gr.Textbox(label="Prompt (optional; bypasses transcription)")
+                submit = gr.Button("Generate Video")
+
+        with gr.Row():
+            video_out = gr.Video(label="Generated Video")
+            meta_out = gr.Code(label="Result JSON")
+
+        # track last clip url
+        last_clip_url = gr.State(None)
+        # Generation gets its own concurrency bucket so a burst of long video
+        # jobs can't starve the cheap clip-library/setup buttons on the default.
+        submit.click(
+            fn=run_speech_to_video,
+            inputs=[audio, prompt],
+            outputs=[video_out, meta_out, last_clip_url],
+            concurrency_id="video_gen",
+            concurrency_limit=2,
+        )
 
-    def _show_clips():
-        return json.dumps(list_clips(), indent=2)
+        def _save_last_clip(note: str, url):
+            # Returns only the saved entry (the delta); serializing the whole
+            # list on every save is O(N) JSON + websocket bytes for data the
+            # user can pull on demand via "Refresh list".
+            if not url:
+                return _dumps({"success": False, "error": "No last clip to save"})
+            entry = add_clip(url, note)
+            _bump_clips_version()
+            return _dumps({"success": True, "saved": entry})
+
+        def _show_clips():
+            # Served from the memo; only the mutators bump the version, so
+            # repeat refreshes with an unchanged library skip the re-dump.
+            # (The clip store's own mtime cache still guards the parse.)
+            return _clips_json()
+
+        def _clear_all_clips():
+            clear_clips()
+            _bump_clips_version()
+            # The list is empty by construction — no need to reload it
+            return _dumps({"success": True, "cleared": True}), _dumps([])
+
+        def _stitch_saved(request: gr.Request):
+            _rate_limit(request)
+            items = list_clips()
+            # Order-preserving dedupe: the same clip saved twice would otherwise
+            # be downloaded and decoded twice by the stitcher.
+            urls = list(dict.fromkeys(i["url"] for i in items if i.get("url")))
+            if not urls:
+                return None, _dumps({"success": False, "error": "No saved clips"})
+            detailed = stitch_videos_detailed(urls)
+            if not detailed.get("success"):
+                return None, _dumps(detailed)
+            return detailed.get("output_path"), _dumps(detailed)
+
+        with gr.Accordion("Clip library", open=False):
+            note = gr.Textbox(label="Note (optional)")
+            save_btn = gr.Button("Save last clip")
+            saved_status = gr.Code(label="Save status")
+            saved_list = gr.Code(label="Saved clips")
+            list_btn = gr.Button("Refresh list")
+            clear_btn = gr.Button("Clear all")
+            stitch_btn = gr.Button("Stitch saved clips")
+            stitched_video = gr.Video(label="Stitched video")
+            stitched_json = gr.Code(label="Stitch result JSON")
+
+            save_btn.click(fn=_save_last_clip, inputs=[note, last_clip_url], outputs=[saved_status])
+            list_btn.click(fn=_show_clips, inputs=None, outputs=[saved_list])
+            clear_btn.click(fn=_clear_all_clips, inputs=None, outputs=[saved_status, saved_list])
+            stitch_btn.click(
+                fn=_stitch_saved,
+                inputs=None,
+                outputs=[stitched_video, stitched_json],
+                concurrency_id="stitch",
+                concurrency_limit=1,
+            )
+
+
+    # Three buckets: generation (video_gen, 2) and stitching (stitch, 1 —
+    # ffmpeg is CPU-heavy) each capped separately, while the cheap handlers
+    # (refresh, list, save, clear) share the default so a burst of heavy
+    # jobs can never starve them.
+    app.queue(default_concurrency_limit=4, max_size=64)
+    # Warm provider connections from here so both entry points get it —
+    # standalone launch and the FastAPI /gradio mount; the once-guard in
+    # _warm_connections makes the repeat start harmless.
+    threading.Thread(target=_warm_connections, daemon=True).start()
+    return app
+
+
+_warmed = False
+
+
+def _warm_connections():
+    """Best-effort startup warmup: prime DNS + TLS to both providers.
+
+    The first real request otherwise pays connection setup (~1 RTT for the
+    TLS 1.3 handshake plus DNS) on top of the provider call. Runs once in a
+    daemon thread; every error is swallowed — warmup must never block or
+    fail startup. Uses models.list for OpenAI (cheap, no quota beyond the
+    call) and a bare GET against the AIMLAPI host on its pooled session
+    (no generation is triggered, the status code is irrelevant)."""
+    global _warmed
+    if _warmed:
+        return
+    _warmed = True
+    try:
+        _openai_client().models.list()
+    except Exception:
+        pass
+    try:
+        client = _system().aiml_client
+        client.session_get.get(client.base_url, timeout=5)
+    except Exception:
+        pass
 
-    def _clear_all_clips():
-        clear_clips()
-        return json.dumps({"success": True, "cleared": True}, indent=2), json.dumps(list_clips(), indent=2)
 
-    def _stitch_saved(request: gr.Request):
-        _rate_limit(request)
-        items = list_clips()
-        urls = [i.get("url") for i in items if i.get("url")]
-        if not urls:
-            return None, json.dumps({"success": False, "error": "No saved clips"}, indent=2)
-        detailed = stitch_videos_detailed(urls)
-        if not detailed.get("success"):
-            return None, json.dumps(detailed, indent=2)
-        return detailed.get("output_path"), json.dumps(detailed, indent=2)
-
-    with gr.Accordion("Clip library", open=False):
-        note = gr.Textbox(label="Note (optional)")
-        save_btn = gr.Button("Save last clip")
-        saved_status = gr.Code(label="Save status")
-        saved_list = gr.Code(label="Saved clips")
-        list_btn = gr.Button("Refresh list")
-        clear_btn = gr.Button("Clear all")
-        stitch_btn = gr.Button("Stitch saved clips")
-        stitched_video = gr.Video(label="Stitched video")
-        stitched_json = gr.Code(label="Stitch result JSON")
-
-        save_btn.click(fn=_save_last_clip, inputs=[note, last_clip_url], outputs=[saved_status, saved_list])
-        list_btn.click(fn=_show_clips, inputs=None, outputs=[saved_list])
-        clear_btn.click(fn=_clear_all_clips, inputs=None, outputs=[saved_status, saved_list])
-        stitch_btn.click(fn=_stitch_saved, inputs=None, outputs=[stitched_video, stitched_json])
+def __getattr__(name):
+    # Keep `from ..webui.app import app` (the optional /gradio mount in the
+    # API server) working without building the UI at import time (PEP 562).
+    if name == "app":
+        return build_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
     host = os.getenv("HOST", "0.0.0.0")
-    app.launch(
+    build_app().launch(
         server_name=host,
         server_port=int(os.getenv("PORT", "5000")),
     )